@@ -0,0 +1,92 @@
+"""Mede o custo da captura de frames no thread do emulador (modo headless).
+
+Cenário 1 (tempo real): o loop é cadenciado a 60 fps como no jogo normal e
+mede-se o tempo ocupado por frame (tick + captura) contra o orçamento de
+16,7 ms. O worker de captura roda nas folgas, mas ainda disputa o GIL; o
+p99 mostra esse efeito.
+
+Cenário 2 (TURBO): velocidade ilimitada; a captura fica limitada ao `fps`
+por segundo de relógio, e o custo relativo em FPS é reportado como está.
+
+Uso: python benchmarks/bench_capture.py [segundos] [fps_captura]
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from pyboy import PyBoy
+from app.capture import GB_FPS, FrameCapture, FrameRing, SegmentWriter
+
+ROM = os.environ.get("PYBOY_ROM", os.path.join(ROOT, "roms", "pokemon_red.gb"))
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _run(segundos, tempo_real, make_capture=None):
+    pyboy = PyBoy(ROM, window="null", sound_emulated=False)
+    pyboy.set_emulation_speed(0)
+    capture = make_capture(pyboy) if make_capture else None
+    ocupado = []
+    frames = 0
+    periodo = 1.0 / GB_FPS
+    inicio = proximo = time.perf_counter()
+    fim = inicio + segundos
+    while time.perf_counter() < fim:
+        t0 = time.perf_counter()
+        pyboy.tick()
+        if capture:
+            capture.on_tick()
+        ocupado.append(time.perf_counter() - t0)
+        frames += 1
+        if tempo_real:
+            proximo += periodo
+            espera = proximo - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+    elapsed = time.perf_counter() - inicio
+    if capture:
+        capture.close()
+    pyboy.stop(save=False)
+    return frames / elapsed, ocupado, capture
+
+
+def _descricao(ocupado, capture):
+    texto = f"média {sum(ocupado) / len(ocupado) * 1000:6.3f} ms  p99 {_percentil(ocupado, 0.99) * 1000:6.3f} ms"
+    if capture:
+        texto += f"  ({capture.captured} exportados, {capture.dropped} descartados)"
+    return texto
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    fps_captura = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    with tempfile.TemporaryDirectory() as tmp:
+        def make(pyboy):
+            screen = pyboy.screen.ndarray
+            sinks = [FrameRing.create(None, screen[::2, ::2, :3].shape), SegmentWriter(tmp)]
+            return FrameCapture(screen, sinks, fps=fps_captura, scale=2)
+
+        print(f"Cenário 1: tempo real ({GB_FPS} fps), captura a {fps_captura:.0f} fps, {segundos:.0f}s")
+        _, ocupado, _ = _run(segundos, True)
+        print(f"  captura desligada: {_descricao(ocupado, None)}")
+        _, ocupado, cap = _run(segundos, True, make)
+        print(f"  captura ligada:    {_descricao(ocupado, cap)}")
+        print(f"  orçamento por frame: {1000 / GB_FPS:.1f} ms")
+
+        print("Cenário 2: TURBO (velocidade ilimitada)")
+        base, _, _ = _run(segundos, False)
+        fps, ocupado, cap = _run(segundos, False, make)
+        print(f"  captura desligada: {base:8.0f} fps")
+        print(f"  captura ligada:    {fps:8.0f} fps ({cap.captured} exportados, {cap.dropped} descartados)")
+        print(f"  custo relativo:    {(1 - fps / base) * 100:5.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Mede passos/s do PyBoyEnv (processo único) e do VecEnv.
+
+O padrão é 25 frames por passo, como no game loop; botões exigem ao menos 2.
+
+Uso: python benchmarks/bench_env.py [passos] [frames_por_passo] [n_envs]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import numpy as np
+from app.env import ACTIONS, DEFAULT_FRAMES, PyBoyEnv, VecEnv
+
+ROM = os.environ.get("PYBOY_ROM", os.path.join(ROOT, "roms", "pokemon_red.gb"))
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_FRAMES
+    n_envs = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 2
+    rng = np.random.default_rng(0)
+
+    env = PyBoyEnv(ROM, frames=frames)
+    env.reset()
+    acoes = rng.integers(0, len(ACTIONS), size=steps).tolist()
+    inicio = time.perf_counter()
+    for a in acoes:
+        env.step(a)
+    elapsed = time.perf_counter() - inicio
+    env.close()
+    print(f"PyBoyEnv:        {steps / elapsed:9.0f} passos/s ({frames} frame(s)/passo)")
+
+    vec = VecEnv(n_envs, rom_path=ROM, frames=frames)
+    vec.reset()
+    rodadas = max(1, steps // n_envs)
+    acoes = rng.integers(0, len(ACTIONS), size=(rodadas, n_envs)).tolist()
+    inicio = time.perf_counter()
+    for linha in acoes:
+        vec.step(linha)
+    elapsed = time.perf_counter() - inicio
+    vec.close()
+    total = rodadas * n_envs
+    print(f"VecEnv x{n_envs:<3}:     {total / elapsed:9.0f} passos/s ({total / elapsed / n_envs:.0f} por processo)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Teste de carga de backpressure contra o broker em memória (`app.local_broker`).
+
+Cenário 1: analytics mais lento que o fluxo de passos (fila ilimitada x limitada com drop-head).
+Cenário 2: game loop travado enquanto comandos chegam (sem corte x com corte de idade).
+Cenário 3: controller com sinal de fluxo (FlowControl) durante o travamento.
+
+Uso: python benchmarks/load_backpressure.py [segundos]
+"""
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from app.local_broker import LocalBroker, LocalClient
+from app.messaging import FlowControl
+
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def cenario_passos(duracao, max_length):
+    broker = LocalBroker()
+    prod, cons = LocalClient(broker), LocalClient(broker)
+    prod.declare_queue("passos", max_length=max_length)
+    latencias = []
+    stop = threading.Event()
+
+    def produtor():
+        # ~4000 passos/s
+        while not stop.is_set():
+            for _ in range(40):
+                prod.publish("passos", str(time.time()))
+            time.sleep(0.01)
+
+    def on_passo(body):
+        latencias.append(time.time() - float(body))
+        time.sleep(0.0005)  # consumidor ~2000/s
+
+    cons.consume("passos", on_passo)
+    t = threading.Thread(target=produtor, daemon=True)
+    t.start()
+    fim = time.time() + duracao
+    while time.time() < fim:
+        cons.process_data_events(time_limit=0.05)
+    stop.set()
+    t.join()
+    return latencias, broker.dropped("passos"), broker.depth("passos")
+
+
+def cenario_comandos(duracao, max_age, flow=None):
+    broker = LocalBroker()
+    ctrl, loop = LocalClient(broker), LocalClient(broker)
+    ctrl.declare_queue("comandos")
+    executados = []
+    recusados = 0
+    loop.consume("comandos", lambda b: executados.append(time.time() - float(b)), max_age=max_age)
+    fim = time.time() + duracao
+    travado_ate = time.time() + duracao / 2
+    while time.time() < fim:
+        # Controller: 50 comandos/s
+        if flow is None or flow.allow(ctrl.queue_depth("comandos")):
+            ctrl.publish("comandos", str(time.time()))
+        else:
+            recusados += 1
+        if time.time() >= travado_ate:
+            loop.process_data_events()
+        time.sleep(0.02)
+    return executados, loop.stale_dropped, recusados
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"Cenário 1: passos a ~4000/s, consumidor a ~2000/s, {duracao:.0f}s")
+    for nome, limite in (("ilimitada", None), ("max 200 drop-head", 200)):
+        lat, drop, depth = cenario_passos(duracao, limite)
+        print(f"  {nome:18} p50 {_pct(lat, .5) * 1000:7.1f} ms  p99 {_pct(lat, .99) * 1000:7.1f} ms"
+              f"  descartados {drop:6}  fila final {depth}")
+
+    print(f"Cenário 2/3: game loop travado por {duracao / 2:.1f}s, comandos a 50/s")
+    for nome, idade, flow in (("sem corte", None, None), ("corte 0.5s", 0.5, None),
+                              ("corte + fluxo", 0.5, FlowControl(high=20))):
+        lat, velhos, recusados = cenario_comandos(duracao, idade, flow)
+        print(f"  {nome:18} executados {len(lat):4}  atraso máx {max(lat, default=0) * 1000:7.1f} ms"
+              f"  descartados {velhos:4}  recusados no controller {recusados}")
+
+
+if __name__ == '__main__':
+    main()
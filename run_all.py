@@ -1,7 +1,6 @@
-import subprocess
 import sys
-import time
 import os
+import logging
 import signal
 
 PYTHON = sys.executable
@@ -13,84 +12,73 @@ else:
     dot = os.path.join(BASE_DIR, ".venv")
     plain = os.path.join(BASE_DIR, "venv")
     VENV_PATH = dot if os.path.isdir(dot) else plain
-ACTIVATE_PS1 = os.path.join(VENV_PATH, "Scripts", "Activate.ps1")
-USE_VENV = os.path.isfile(ACTIVATE_PS1)
+if os.name == 'nt':
+    VENV_PYTHON = os.path.join(VENV_PATH, "Scripts", "python.exe")
+else:
+    VENV_PYTHON = os.path.join(VENV_PATH, "bin", "python")
+USE_VENV = os.path.isfile(VENV_PYTHON)
 SRC = os.path.join(BASE_DIR, 'src')
+sys.path.insert(0, SRC)
 
-def _build_commands():
-    base_cmds = [
-        ("GameLoop", f"python {os.path.join(SRC, 'game_loop.py')}"),
-        ("Controller", f"python {os.path.join(SRC, 'controller.py')}"),
-        ("Analytics", f"python {os.path.join(SRC, 'analytics.py')}"),
-    ]
-    if USE_VENV:
-        wrapped = []
-        for name, raw in base_cmds:
-            cmd = f"& '{ACTIVATE_PS1}'; {raw}"
-            wrapped.append((name, cmd))
-        return wrapped
-    return base_cmds
+from app.config import ConfigLoader
+from app.health import REPLICA_ENV, broker_reachable, wait_until
+from app.logging_setup import init_logger
+from app.supervisor import ProcessSpec, Supervisor, parse_cpus
 
-COMMANDS = _build_commands()
+logger = logging.getLogger("run_all")
 
-def _kill_process(proc):
-    if proc.poll() is not None:
-        return
-    try:
-        
-        if os.name == 'nt':
-            proc.send_signal(signal.CTRL_BREAK_EVENT)
-        else:
-            proc.terminate()
-        for _ in range(10):
-            if proc.poll() is not None:
-                return
-            time.sleep(0.1)
-        
-        if os.name == 'nt':
-            subprocess.run(["taskkill", "/PID", str(proc.pid), "/T", "/F"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        else:
-            proc.kill()
-    except Exception:
-        pass
 
-
-def kill_all(procs):
-    print("\nEncerrando todos os processos...")
-    for name, p in procs:
-        _kill_process(p)
-    print("Todos encerrados.")
+def _build_specs(config, extra):
+    python = VENV_PYTHON if USE_VENV else PYTHON
+    replicas = config.analytics_replicas
+    specs = [
+        ProcessSpec("GameLoop", [python, os.path.join(SRC, 'game_loop.py')] + extra,
+                    restart="on-failure", cpus=parse_cpus(config.emulator_cpus), new_console=True),
+        ProcessSpec("Controller", [python, os.path.join(SRC, 'controller.py')] + extra,
+                    restart="never", new_console=True),
+    ]
+    for i in range(replicas):
+        # As réplicas dividem as filas em round-robin: cada uma só vê parte da sessão,
+        # então relatórios e checkpoints levam o índice e só a primeira abre o dashboard.
+        env = {}
+        argv = [python, os.path.join(SRC, 'analytics.py')] + extra
+        if replicas > 1:
+            env[REPLICA_ENV] = str(i + 1)
+            if i > 0:
+                # Último --set vence, inclusive sobre um dashboard.port passado pelo usuário.
+                argv += ["--set", "dashboard.port=0"]
+        name = "Analytics" if replicas == 1 else f"Analytics#{i + 1}"
+        specs.append(ProcessSpec(name, argv, restart="on-failure", env=env, new_console=True))
+    return specs
 
 
 def launch_all(auto_shutdown_on_exit=True):
-    procs = []
-    for name, cmd in COMMANDS:
-        creationflags = 0
-        if os.name == 'nt':
-            creationflags = subprocess.CREATE_NEW_CONSOLE
-        print(f"Iniciando {name}: {cmd}")
-        
-        if USE_VENV and os.name == 'nt':
-            p = subprocess.Popen(["powershell", "-NoExit", "-Command", cmd], creationflags=creationflags)
-        else:
-            p = subprocess.Popen(cmd, creationflags=creationflags, shell=True)
-        procs.append((name, p))
-        time.sleep(0.4)
+    init_logger()
+    # Flags de configuração (--config, --set) são repassadas aos três processos.
+    extra = sys.argv[1:]
+    config = ConfigLoader(extra).load()
+    if USE_VENV:
+        logger.info("Usando Python da venv: %s", VENV_PYTHON)
+    logger.info("Aguardando RabbitMQ...")
+    if not wait_until(lambda: broker_reachable(config.broker_host), timeout=config.broker_timeout, interval=0.2):
+        logger.error("RabbitMQ inacessível; abortando.")
+        return
 
-    print("\nTodos iniciados.")
+    sup = Supervisor(_build_specs(config, extra), shutdown_on_exit=auto_shutdown_on_exit)
+    if hasattr(signal, 'SIGHUP'):
+        # SIGHUP no supervisor recarrega a configuração de todos os processos.
+        signal.signal(signal.SIGHUP, lambda signum, frame: sup.send_signal(signal.SIGHUP))
     try:
-        while True:
-            time.sleep(2)
-            mortos = [n for n, pr in procs if pr.poll() is not None]
-            if mortos:
-                print(f"Processos finalizados: {', '.join(mortos)}")
-                if auto_shutdown_on_exit:
-                    print("Um processo terminou; encerrando o restante (auto_shutdown_on_exit=True).")
-                    break
+        total = sup.start(ready_timeout=config.ready_timeout)
+        if total is not None:
+            print(f"\nTodos prontos em {total:.2f}s.")
+        sup.run()
     except KeyboardInterrupt:
         print("\nCTRL+C recebido.")
     finally:
-        kill_all(procs)
+        print("\nEncerrando todos os processos...")
+        sup.stop()
+        print("Todos encerrados.")
 
 if __name__ == '__main__':
     launch_all()
@@ -1,204 +1,151 @@
+import os
 import pika
+import signal
+import sys
 from datetime import datetime
-from collections import defaultdict
-
-
-stats = {
-    'passos': 0,
-    'batalhas': 0,
-    'comandos_total': 0,
-    'comandos_movimento': 0,
-    'comandos_botao': 0,
-    'comandos_velocidade': 0,
-    'comandos_audio': 0,
-    'comandos_detalhados': defaultdict(int),
-    'inicio_sessao': None,
-    'fim_sessao': None,
-    'historico_passos': []  # [(timestamp, total_passos)]
-}
-
-def gerar_relatorio_final():
-    # Marcar fim da sessão
-    stats['fim_sessao'] = datetime.now()
-
-    timestamp = stats['fim_sessao'].strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"relatorio_{timestamp}.txt"
-
-    # Calcular métricas derivadas
-    duracao = None
-    passos_por_minuto = 0
-    taxa_batalha = 0
-
-    if stats['inicio_sessao']:
-        duracao = stats['fim_sessao'] - stats['inicio_sessao']
-        minutos = duracao.total_seconds() / 60
-        if minutos > 0:
-            passos_por_minuto = stats['passos'] / minutos
-
-    if stats['passos'] > 0:
-        taxa_batalha = (stats['batalhas'] / stats['passos']) * 100
-
-    # Construir relatório
-    relatorio = [
-        "="*60,
-        "📊 RELATÓRIO FINAL DA SESSÃO - POKÉMON RED EMULATOR",
-        "="*60,
-        f"📅 Data/Hora Final: {stats['fim_sessao'].strftime('%d/%m/%Y %H:%M:%S')}",
-        ""
-    ]
-
-    # Seção: Tempo de Sessão
-    if duracao:
-        horas = int(duracao.total_seconds() // 3600)
-        minutos = int((duracao.total_seconds() % 3600) // 60)
-        segundos = int(duracao.total_seconds() % 60)
-        relatorio.extend([
-            "⏱️  TEMPO DE SESSÃO",
-            "-" * 60,
-            f"   Início:   {stats['inicio_sessao'].strftime('%d/%m/%Y %H:%M:%S')}",
-            f"   Término:  {stats['fim_sessao'].strftime('%d/%m/%Y %H:%M:%S')}",
-            f"   Duração:  {horas}h {minutos}m {segundos}s",
-            ""
-        ])
-
-    # Seção: Estatísticas de Movimento
-    relatorio.extend([
-        "🚶 MOVIMENTO E EXPLORAÇÃO",
-        "-" * 60,
-        f"   👣 Total de Passos:       {stats['passos']:,}",
-        f"   📍 Distância Percorrida:  ~{stats['passos']} tiles",
-    ])
-    if passos_por_minuto > 0:
-        relatorio.append(f"   🏃 Ritmo de Jogo:         {passos_por_minuto:.1f} passos/min")
-    relatorio.append("")
-
-    # Seção: Batalhas
-    relatorio.extend([
-        "⚔️  BATALHAS",
-        "-" * 60,
-        f"   🎯 Batalhas Iniciadas:    {stats['batalhas']}",
-    ])
-    if stats['passos'] > 0:
-        relatorio.append(f"   📊 Taxa de Encontros:     {taxa_batalha:.2f}% (batalhas/100 passos)")
-        if stats['batalhas'] > 0:
-            passos_por_batalha = stats['passos'] / stats['batalhas']
-            relatorio.append(f"   📈 Média:                 1 batalha a cada {passos_por_batalha:.1f} passos")
-    relatorio.append("")
-
-    # Seção: Comandos Executados
-    if stats['comandos_total'] > 0:
-        relatorio.extend([
-            "🎮 COMANDOS EXECUTADOS",
-            "-" * 60,
-            f"   📊 Total de Comandos:     {stats['comandos_total']:,}",
-            f"      • Movimento:          {stats['comandos_movimento']} ({stats['comandos_movimento']/stats['comandos_total']*100:.1f}%)",
-            f"      • Botões (A/B):       {stats['comandos_botao']} ({stats['comandos_botao']/stats['comandos_total']*100:.1f}%)",
-            f"      • Velocidade:         {stats['comandos_velocidade']} ({stats['comandos_velocidade']/stats['comandos_total']*100:.1f}%)",
-            f"      • Áudio:              {stats['comandos_audio']} ({stats['comandos_audio']/stats['comandos_total']*100:.1f}%)",
-            ""
-        ])
-
-        # Top 5 comandos mais usados
-        if stats['comandos_detalhados']:
-            top_comandos = sorted(stats['comandos_detalhados'].items(),
-                                 key=lambda x: x[1], reverse=True)[:5]
-            relatorio.extend([
-                "   🏆 Top 5 Comandos Mais Usados:",
-            ])
-            for i, (cmd, count) in enumerate(top_comandos, 1):
-                relatorio.append(f"      {i}. {cmd:8} → {count:4} vezes")
-            relatorio.append("")
-
-    # Seção: Performance
-    if duracao and stats['comandos_total'] > 0:
-        comandos_por_minuto = stats['comandos_total'] / (duracao.total_seconds() / 60)
-        relatorio.extend([
-            "⚡ PERFORMANCE",
-            "-" * 60,
-            f"   🎯 Comandos/minuto:       {comandos_por_minuto:.1f}",
-            f"   🎮 APM (Actions/min):     {comandos_por_minuto:.0f}",
-            ""
-        ])
-
-    # Rodapé
-    relatorio.extend([
-        "="*60,
-        "✅ Fim da execução - Sessão encerrada com sucesso!",
-        "="*60
-    ])
-
-    # Exibir no console
-    for linha in relatorio:
-        print(linha)
-
-    # Salvar em arquivo TXT
+from app.dashboard import LiveMetrics, start_from_config
+from app.logging_setup import init_logger
+from app.health import mark_ready, replica_id
+from app.config import ConfigLoader
+from app.messaging import declare_with_fallback, queue_arguments
+from app.report import Checkpointer, SessionStats, export, parse_formats, render_text
+
+
+sessao = SessionStats()
+
+def _formatos(config):
     try:
-        with open(nome_arquivo, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(relatorio))
-        print(f"\n💾 Relatório salvo em: {nome_arquivo}")
-    except Exception as e:
-        print(f"\n⚠️ Erro ao salvar relatório: {e}")
+        return parse_formats(config.report_formats)
+    except ValueError as e:
+        print(f"⚠️ {e}; usando txt")
+        return ['txt']
+
+def _sufixo_replica():
+    # Com várias réplicas cada uma recebe só parte dos eventos; os arquivos levam o índice.
+    replica = replica_id()
+    return f"_r{replica}" if replica else ""
+
+def gerar_relatorio_final(config):
+    fim = datetime.now()
+    resumo = sessao.resumo(fim)
+    replica = replica_id()
+    if replica:
+        print(f"⚠️ Relatório parcial: apenas os eventos recebidos pela réplica {replica}.")
+    print(render_text(resumo))
+
+    base = os.path.join(config.report_dir, f"relatorio{_sufixo_replica()}_{fim.strftime('%Y%m%d_%H%M%S')}")
+    formatos = _formatos(config)
+    gravados = export(sessao, base, formatos, fim=fim)
+    for caminho in gravados:
+        print(f"\n💾 Relatório salvo em: {caminho}")
+    return len(gravados) == len(formatos)
 
 def main():
-    # Inicializar tempo de sessão
-    stats['inicio_sessao'] = datetime.now()
+    global sessao
+    sessao = SessionStats()
+    loader = ConfigLoader(sys.argv[1:])
+    config = loader.load()
+    init_logger()
+    metrics = LiveMetrics(sessao)
+    # Checkpoint sobrescrito periodicamente: uma queda não perde a sessão inteira. O pid separa
+    # réplicas e reinícios, para um processo novo não sobrescrever o checkpoint do que caiu.
+    checkpoint = Checkpointer(sessao, os.path.join(config.report_dir,
+                                                   f"relatorio_checkpoint{_sufixo_replica()}_{os.getpid()}"),
+                              config.checkpoint_interval, [f for f in _formatos(config) if f != 'txt'])
 
     try:
-        connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
+        connection = pika.BlockingConnection(pika.ConnectionParameters(config.broker_host))
         channel = connection.channel()
-        channel.queue_declare(queue='fila_eventos')
+        channel.queue_declare(queue=config.queue_events)
+        # Passos podem ser descartados (mais antigos primeiro); batalhas e comandos nunca.
+        channel = declare_with_fallback(connection, channel, config.queue_steps,
+                                        queue_arguments(config.steps_max_length))
     except Exception as e:
         print(f"❌ Erro ao conectar no RabbitMQ: {e}")
-        return
+        sys.exit(1)
 
     print("📈 Analytics iniciado! Ouvindo eventos do jogo...")
     print("➡️  Pressione CTRL+C para encerrar e ver o relatório.")
-
-    # Categorização de comandos
-    movimentos = {'UP', 'DOWN', 'LEFT', 'RIGHT'}
-    botoes = {'A', 'B', 'START', 'SELECT'}
-    velocidades = {'TURBO', 'NORMAL', 'LENTO'}
-    audio = {'VOL+', 'VOL-', 'MUTE', 'UNMUTE'}
+    dashboard = start_from_config(metrics, config)
+
+    # Confirmações em lote (ack múltiplo); nunca maior que o prefetch em vigor, senão o consumo trava.
+    ack = {'pendentes': 0, 'ultima_tag': None, 'recarga': False}
+    prefetch = config.prefetch
+
+    def lote_ack():
+        return min(config.ack_batch, prefetch)
+
+    def confirmar_pendentes():
+        if ack['pendentes']:
+            channel.basic_ack(delivery_tag=ack['ultima_tag'], multiple=True)
+            ack['pendentes'] = 0
+
+    def recarregar_config():
+        nonlocal config
+        config, alterados = loader.reload(config)
+        if 'checkpoint_interval' in alterados:
+            checkpoint.intervalo = config.checkpoint_interval
+        if 'dashboard_hz' in alterados and dashboard:
+            dashboard.set_rate(config.dashboard_hz)
+        if 'report_formats' in alterados:
+            checkpoint.formatos = [f for f in _formatos(config) if f != 'txt']
+
+    def temporizador():
+        confirmar_pendentes()
+        checkpoint.maybe_write()
+        if ack['recarga']:
+            ack['recarga'] = False
+            recarregar_config()
+        connection.call_later(1.0, temporizador)
+
+    def on_sighup(signum, frame):
+        ack['recarga'] = True
+
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, on_sighup)
 
     def callback_eventos(ch, method, _, body):
         evento = body.decode()
 
-        if evento == 'EVENTO_PASSO':
-            stats['passos'] += 1
-            print(".", end="", flush=True)
+        if evento == 'COMANDO_RELOAD':
+            recarregar_config()
+
+        elif evento == 'EVENTO_PASSO':
+            sessao.record_step()
 
         elif evento == 'EVENTO_BATALHA':
-            stats['batalhas'] += 1
-            print(f"\n[⚔️ BATALHA DETECTADA! Total: {stats['batalhas']}]")
+            sessao.record_battle()
+            print(f"[⚔️ BATALHA DETECTADA! Total: {sessao.batalhas}]")
 
         # Capturar comandos enviados pelo controller (prefixo COMANDO_)
         elif evento.startswith('COMANDO_'):
             comando = evento.replace('COMANDO_', '')
 
-            # Contadores gerais
-            stats['comandos_total'] += 1
-            stats['comandos_detalhados'][comando] += 1
-
-            # Categorização
-            if comando in movimentos:
-                stats['comandos_movimento'] += 1
-            elif comando in botoes:
-                stats['comandos_botao'] += 1
-            elif comando in velocidades:
-                stats['comandos_velocidade'] += 1
-            elif comando in audio:
-                stats['comandos_audio'] += 1
+            sessao.record_command(comando)
 
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        ack['pendentes'] += 1
+        ack['ultima_tag'] = method.delivery_tag
+        if ack['pendentes'] >= lote_ack():
+            confirmar_pendentes()
 
-    # Consumir apenas fila_eventos
-    channel.basic_consume(queue='fila_eventos', on_message_callback=callback_eventos)
+    # Prefetch limitado: sem ele o broker empurra tudo ao consumidor e x-max-length não tem efeito.
+    channel.basic_qos(prefetch_count=prefetch)
+    # Consumir fila de eventos (batalhas/comandos) e a fila de passos
+    channel.basic_consume(queue=config.queue_events, on_message_callback=callback_eventos)
+    channel.basic_consume(queue=config.queue_steps, on_message_callback=callback_eventos)
+    connection.call_later(1.0, temporizador)
+    mark_ready()
 
     try:
         channel.start_consuming()
     except KeyboardInterrupt:
         channel.stop_consuming()
-        gerar_relatorio_final()
+        confirmar_pendentes()
+        if dashboard:
+            dashboard.stop()
+        if gerar_relatorio_final(config):
+            # Relatório final completo: o checkpoint só interessa se o processo cair.
+            checkpoint.discard()
         connection.close()
 
 if __name__ == '__main__':
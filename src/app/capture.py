@@ -0,0 +1,204 @@
+""""""
+from __future__ import annotations
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GB_FPS = 60
+
+
+class FrameRing:
+    """Anel de frames em memória compartilhada para consumidores locais.
+
+    Cabeçalho: contador de escritas (uint64) seguido de slots, altura,
+    largura e canais (uint32), para que o consumidor precise só do nome.
+    """
+
+    HEADER = 32
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._count = np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=0)
+        dims = np.ndarray((4,), dtype=np.uint32, buffer=shm.buf, offset=8)
+        self.slots = int(dims[0])
+        self.shape = (int(dims[1]), int(dims[2]), int(dims[3]))
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=self.HEADER)
+
+    @classmethod
+    def create(cls, name: Optional[str], shape, slots: int = 8) -> "FrameRing":
+        size = cls.HEADER + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=0)[0] = 0
+        np.ndarray((4,), dtype=np.uint32, buffer=shm.buf, offset=8)[:] = (slots,) + tuple(shape)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        # Leitores não podem registrar o segmento no resource_tracker: ao sair, ele
+        # apagaria (unlink) o anel do game_loop. `track=False` só existe no 3.13+.
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name != 'nt':
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        return int(self._count[0])
+
+    def write(self, frame: np.ndarray):
+        n = self.count
+        self._frames[n % self.slots] = frame
+        self._count[0] = n + 1
+
+    def latest(self) -> Optional[np.ndarray]:
+        n = self.count
+        if n == 0:
+            return None
+        return self._frames[(n - 1) % self.slots].copy()
+
+    def close(self):
+        self._count = self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SegmentWriter:
+    """Grava segmentos rotativos `.npz` comprimidos, mantendo só os `keep` mais recentes."""
+
+    def __init__(self, directory: str, frames_per_segment: int = 300, keep: int = 5):
+        self._dir = directory
+        self._per_segment = frames_per_segment
+        self._buffer: List[np.ndarray] = []
+        self._written: deque = deque()
+        self._keep = keep
+        self._index = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, frame: np.ndarray):
+        self._buffer.append(frame)
+        if len(self._buffer) >= self._per_segment:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        path = os.path.join(self._dir, f"segmento_{self._index:06d}.npz")
+        np.savez_compressed(path, frames=np.stack(self._buffer))
+        self._buffer = []
+        self._index += 1
+        self._written.append(path)
+        while len(self._written) > self._keep:
+            antigo = self._written.popleft()
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+    def close(self):
+        self._flush()
+
+
+class FrameCapture:
+    """Exporta frames do PyBoy sem travar o loop de ticks.
+
+    No thread do emulador ocorre só um `copyto` do buffer de tela (view
+    zero-copy `pyboy.screen.ndarray`) para um buffer pré-alocado; redução,
+    gravação e compressão rodam no pool. Sem buffer livre, o frame é
+    descartado em vez de atrasar o tick.
+
+    `fps` vale tanto em frames de jogo (1 a cada 60/fps ticks) quanto em
+    tempo real: em TURBO o limite de relógio evita exportar centenas de
+    frames por segundo e disputar o GIL com o emulador.
+    """
+
+    def __init__(self, screen: np.ndarray, sinks: Iterable, fps: float = 10, scale: int = 2,
+                 workers: int = 1, max_inflight: int = 4, clock: Callable[[], float] = time.monotonic):
+        self._screen = screen
+        self._sinks = list(sinks)
+        self.set_fps(fps)
+        self._clock = clock
+        self._last = float("-inf")
+        self._scale = max(1, scale)
+        self._free = deque(np.empty_like(screen) for _ in range(max_inflight))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="capture")
+        self._frame = 0
+        self.captured = 0
+        self.dropped = 0
+
+    def set_fps(self, fps: float):
+        self._every = max(1, round(GB_FPS / fps))
+        # Pequena folga para não perder frames por jitter a 60 fps.
+        self._min_interval = 0.9 / fps
+
+    def on_tick(self):
+        self._frame += 1
+        if self._frame % self._every:
+            return
+        now = self._clock()
+        if now - self._last < self._min_interval:
+            return
+        try:
+            buf = self._free.popleft()
+        except IndexError:
+            self.dropped += 1
+            return
+        self._last = now
+        np.copyto(buf, self._screen)
+        self._pool.submit(self._encode, buf)
+
+    def _encode(self, buf: np.ndarray):
+        try:
+            s = self._scale
+            frame = np.ascontiguousarray(buf[::s, ::s, :3])
+            for sink in self._sinks:
+                sink.write(frame)
+            self.captured += 1
+        except Exception as e:
+            logger.warning("Falha ao exportar frame: %s", e)
+        finally:
+            self._free.append(buf)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for sink in self._sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.warning("Falha ao fechar destino de captura: %s", e)
+        logger.info("Captura encerrada: %d frames exportados, %d descartados", self.captured, self.dropped)
+
+
+def capture_from_config(pyboy, config) -> Optional[FrameCapture]:
+    """Cria a captura conforme os campos `capture*` de `AppConfig`; None se desativada."""
+    if not config.capture:
+        return None
+    screen = pyboy.screen.ndarray
+    scale = config.capture_scale
+    shape = screen[::scale, ::scale, :3].shape
+    sinks = []
+    if config.capture_ring:
+        sinks.append(FrameRing.create(config.capture_ring, shape, slots=config.capture_slots))
+    if config.capture_dir:
+        sinks.append(SegmentWriter(config.capture_dir, frames_per_segment=config.capture_segment))
+    if not sinks:
+        logger.warning("Captura ativa sem destino (defina capture.ring e/ou capture.dir)")
+        return None
+    logger.info("Captura de frames ativa: %.0f fps, escala 1/%d, %d destino(s)", config.capture_fps, scale, len(sinks))
+    return FrameCapture(screen, sinks, fps=config.capture_fps, scale=scale)
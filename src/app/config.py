@@ -1,15 +1,173 @@
+import argparse
+import json
+import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.constants import QUEUE_COMMANDS, QUEUE_EVENTS, QUEUE_STEPS
+
+logger = logging.getLogger(__name__)
+
+CONFIG_ENV = "PYBOY_CONFIG"
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _opt(default, env: str, path: str, reload: bool = True, minimum=None):
+    """Campo de configuração: `env` é a variável de ambiente, `path` a chave no arquivo (`secao.chave`)."""
+    return field(default=default, metadata={"env": env, "path": path, "reload": reload, "min": minimum})
+
 
 @dataclass
 class AppConfig:
-    rom_path: str
-    queue_commands: str
-    queue_events: str
+    rom_path: str = _opt("roms/pokemon_red.gb", "PYBOY_ROM", "rom_path", reload=False)
+    queue_commands: str = _opt(QUEUE_COMMANDS, "QUEUE_COMMANDS", "queues.commands", reload=False)
+    queue_events: str = _opt(QUEUE_EVENTS, "QUEUE_EVENTS", "queues.events", reload=False)
+    queue_steps: str = _opt(QUEUE_STEPS, "QUEUE_STEPS", "queues.steps", reload=False)
+    # Argumentos de fila não mudam depois de declarada: para valer, a fila precisa ser apagada no broker.
+    steps_max_length: int = _opt(1000, "PYBOY_STEPS_MAX_LEN", "queues.steps_max_length", reload=False, minimum=1)
+    broker_host: str = _opt("127.0.0.1", "RABBITMQ_HOST", "broker.host", reload=False)
+    # basic_qos só vale para consumidores registrados depois da chamada.
+    prefetch: int = _opt(50, "PYBOY_PREFETCH", "broker.prefetch", reload=False, minimum=1)
+    emulation_speed: int = _opt(1, "PYBOY_EMULATION_SPEED", "game_loop.emulation_speed", minimum=0)
+    poll_every: int = _opt(1, "PYBOY_POLL_EVERY", "game_loop.poll_every", minimum=1)
+    command_max_age: float = _opt(2.0, "PYBOY_COMMAND_MAX_AGE", "game_loop.command_max_age", minimum=0)
+    commands_high_watermark: int = _opt(20, "PYBOY_COMMANDS_HIGH_WATERMARK", "controller.commands_high_watermark", minimum=1)
+    ack_batch: int = _opt(1, "PYBOY_ACK_BATCH", "analytics.ack_batch", minimum=1)
+    report_dir: str = _opt(".", "PYBOY_REPORT_DIR", "analytics.report_dir", reload=False)
+    report_formats: str = _opt("txt,json,csv", "PYBOY_REPORT_FORMATS", "analytics.report_formats")
+    checkpoint_interval: float = _opt(60.0, "PYBOY_CHECKPOINT_INTERVAL", "analytics.checkpoint_interval", minimum=0)
+    dashboard_port: int = _opt(8765, "PYBOY_DASHBOARD_PORT", "dashboard.port", reload=False, minimum=0)
+    dashboard_hz: float = _opt(2.0, "PYBOY_DASHBOARD_HZ", "dashboard.hz", minimum=0.1)
+    capture: bool = _opt(False, "PYBOY_CAPTURE", "capture.enabled", reload=False)
+    capture_fps: float = _opt(10.0, "PYBOY_CAPTURE_FPS", "capture.fps", minimum=0.1)
+    # Formato dos buffers e destinos são fixados na criação da captura.
+    capture_scale: int = _opt(2, "PYBOY_CAPTURE_SCALE", "capture.scale", reload=False, minimum=1)
+    capture_ring: str = _opt("", "PYBOY_CAPTURE_RING", "capture.ring", reload=False)
+    capture_slots: int = _opt(8, "PYBOY_CAPTURE_SLOTS", "capture.slots", reload=False, minimum=1)
+    capture_dir: str = _opt("", "PYBOY_CAPTURE_DIR", "capture.dir", reload=False)
+    capture_segment: int = _opt(300, "PYBOY_CAPTURE_SEGMENT", "capture.segment", reload=False, minimum=1)
+    emulator_cpus: str = _opt("", "PYBOY_EMULATOR_CPUS", "supervisor.emulator_cpus", reload=False)
+    analytics_replicas: int = _opt(1, "PYBOY_ANALYTICS_REPLICAS", "supervisor.analytics_replicas", reload=False, minimum=1)
+    broker_timeout: float = _opt(30.0, "PYBOY_BROKER_TIMEOUT", "supervisor.broker_timeout", reload=False, minimum=0)
+    ready_timeout: float = _opt(60.0, "PYBOY_READY_TIMEOUT", "supervisor.ready_timeout", reload=False, minimum=0)
+
+
+ENV_VARS = [f.metadata["env"] for f in fields(AppConfig)] + [CONFIG_ENV]
+
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off", ""}
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(value)
+
+
+def _cast(f, value: Any):
+    try:
+        out = _to_bool(value) if f.type is bool else f.type(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{f.metadata['path']}: valor inválido {value!r} (esperado {f.type.__name__})")
+    minimum = f.metadata["min"]
+    if minimum is not None and out < minimum:
+        raise ConfigError(f"{f.metadata['path']}: {out} abaixo do mínimo {minimum}")
+    return out
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    try:
+        import tomllib
+    except ImportError:
+        raise ConfigError(f"{path}: arquivos TOML exigem Python 3.11+ (use .json)")
+    with open(path, "rb") as fh:
+        return tomllib.load(fh)
+
+
+def _lookup(data: Dict[str, Any], path: str):
+    node: Any = data
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def _parse_args(argv: Sequence[str]) -> Tuple[Optional[str], Dict[str, str]]:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--config")
+    parser.add_argument("--set", action="append", default=[], metavar="CHAVE=VALOR")
+    args, _ = parser.parse_known_args(list(argv))
+    overrides = {}
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ConfigError(f"--set espera CHAVE=VALOR, recebido {item!r}")
+        overrides[key.strip()] = value.strip()
+    return args.config, overrides
+
+
+class ConfigLoader:
+    """Combina padrões < arquivo < variáveis de ambiente < flags de linha de comando.
+
+    O arquivo vem de `--config` ou `PYBOY_CONFIG` (TOML ou JSON, com seções
+    como `[game_loop]`); `--set secao.chave=valor` sobrescreve uma chave.
+    `reload()` relê as mesmas fontes e mantém os campos não recarregáveis.
+    """
+
+    def __init__(self, argv: Optional[Sequence[str]] = None):
+        self._path, self._overrides = _parse_args(argv or [])
+        known = {f.metadata["path"] for f in fields(AppConfig)}
+        for key in self._overrides:
+            if key not in known:
+                raise ConfigError(f"Chave desconhecida: {key}")
+
+    def load(self) -> AppConfig:
+        path = self._path or os.environ.get(CONFIG_ENV)
+        data = _read_file(path) if path else {}
+        values = {}
+        for f in fields(AppConfig):
+            key = f.metadata["path"]
+            raw = _lookup(data, key)
+            raw = os.environ.get(f.metadata["env"], raw)
+            raw = self._overrides.get(key, raw)
+            if raw is not None:
+                values[f.name] = _cast(f, raw)
+        return AppConfig(**values)
+
+    def reload(self, current: AppConfig) -> Tuple[AppConfig, List[str]]:
+        """Devolve a nova configuração e os campos alterados; em erro mantém a atual."""
+        try:
+            new = self.load()
+        except (ConfigError, OSError, ValueError) as e:
+            logger.error("Recarga de configuração falhou: %s", e)
+            return current, []
+        changes = {}
+        for f in fields(AppConfig):
+            old_v, new_v = getattr(current, f.name), getattr(new, f.name)
+            if old_v == new_v:
+                continue
+            if not f.metadata["reload"]:
+                logger.warning("%s exige reinício; mantendo %r", f.metadata["path"], old_v)
+                continue
+            changes[f.name] = new_v
+        if changes:
+            logger.info("Configuração recarregada: %s", ", ".join(f"{k}={v!r}" for k, v in changes.items()))
+        return replace(current, **changes), list(changes)
 
 
-def load_config() -> AppConfig:
-    rom = os.environ.get("PYBOY_ROM", "roms/pokemon_red.gb")
-    q_cmd = os.environ.get("QUEUE_COMMANDS", "fila_comandos")
-    q_evt = os.environ.get("QUEUE_EVENTS", "fila_eventos")
-    return AppConfig(rom_path=rom, queue_commands=q_cmd, queue_events=q_evt)
+def load_config(argv: Optional[Sequence[str]] = None) -> AppConfig:
+    return ConfigLoader(argv).load()
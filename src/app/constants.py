@@ -4,3 +4,4 @@ MEM_Y_POS = 0xD361
 MEM_BATTLE = 0xD057
 QUEUE_COMMANDS = "fila_comandos"
 QUEUE_EVENTS = "fila_eventos"
+QUEUE_STEPS = "fila_passos"
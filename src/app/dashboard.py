@@ -0,0 +1,200 @@
+""""""
+from __future__ import annotations
+import heapq
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from app.report import SessionStats
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 5
+
+_PAGE = """<!doctype html>
+<meta charset="utf-8"><title>PyBoy Analytics</title>
+<pre id="m">aguardando...</pre>
+<script>
+const m = {};
+const es = new EventSource('/events');
+es.onmessage = (e) => { Object.assign(m, JSON.parse(e.data));
+  document.getElementById('m').textContent = JSON.stringify(m, null, 2); };
+</script>
+"""
+
+
+class LiveMetrics:
+    """Visão ao vivo de um `SessionStats`; `diff()` devolve só o que mudou desde a última chamada.
+
+    Não conta nada: lê os agregados que o analytics já mantém, a partir da
+    thread do dashboard. Os contadores são inteiros e `dict(...)` copia o
+    dicionário de comandos de uma vez sob o GIL, então não há trava no caminho
+    de cada evento.
+    """
+
+    def __init__(self, stats: SessionStats):
+        self._stats = stats
+        self._lock = threading.Lock()
+        self._top_total = -1
+        self._top: List[List] = []
+        self._enviado: Dict[str, object] = {}
+
+    def snapshot(self) -> Dict[str, object]:
+        s = self._stats
+        with self._lock:
+            minutos = s.elapsed() / 60
+            passos, batalhas, comandos = s.passos, s.batalhas, s.comandos_total
+            if comandos != self._top_total:
+                por_comando = dict(s.por_comando)
+                self._top = [[c, n] for c, n in heapq.nlargest(TOP_N, por_comando.items(), key=lambda x: x[1])]
+                self._top_total = comandos
+            return {
+                'passos': passos,
+                'batalhas': batalhas,
+                'comandos': comandos,
+                'passos_por_minuto': round(passos / minutos, 1) if minutos > 0 else 0.0,
+                'taxa_batalha': round(batalhas / passos * 100, 2) if passos else 0.0,
+                'apm': round(comandos / minutos, 1) if minutos > 0 else 0.0,
+                'top_comandos': self._top,
+            }
+
+    def diff(self) -> Dict[str, object]:
+        atual = self.snapshot()
+        mudou = {k: v for k, v in atual.items() if self._enviado.get(k) != v}
+        self._enviado = atual
+        return mudou
+
+
+class DashboardServer:
+    """Servidor SSE local que publica `LiveMetrics.diff()` em taxa fixa.
+
+    O diff é serializado uma vez por tick e enfileirado para cada cliente,
+    então o custo por espectador é só a escrita no socket.
+    """
+
+    def __init__(self, metrics: LiveMetrics, host: str = "127.0.0.1", port: int = 8765, tick_hz: float = 2.0):
+        self._metrics = metrics
+        self._interval = 1.0 / tick_hz
+        self._clients: List[queue.Queue] = []
+        self._clients_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def set_rate(self, tick_hz: float):
+        # Lido a cada espera do loop de broadcast; vale a partir do próximo tick.
+        self._interval = 1.0 / tick_hz
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logger.debug("dashboard: " + fmt, *args)
+
+            def do_GET(self):
+                if self.path == '/events':
+                    server._serve_events(self)
+                elif self.path == '/snapshot':
+                    body = json.dumps(server._metrics.snapshot()).encode()
+                    self._send(200, 'application/json', body)
+                elif self.path == '/':
+                    self._send(200, 'text/html; charset=utf-8', _PAGE.encode())
+                else:
+                    self._send(404, 'text/plain', b'not found')
+
+            def _send(self, status, ctype, body):
+                self.send_response(status)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _serve_events(self, handler: BaseHTTPRequestHandler):
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+        fila: queue.Queue = queue.Queue(maxsize=64)
+        with self._clients_lock:
+            self._clients.append(fila)
+        try:
+            # Novo espectador recebe o estado completo; depois só diffs.
+            handler.wfile.write(self._frame(self._metrics.snapshot()))
+            handler.wfile.flush()
+            while not self._stop.is_set():
+                try:
+                    data = fila.get(timeout=15)
+                except queue.Empty:
+                    data = b": keepalive\n\n"
+                handler.wfile.write(data)
+                handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._clients_lock:
+                self._clients.remove(fila)
+
+    @staticmethod
+    def _frame(payload: Dict[str, object]) -> bytes:
+        return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+    def _broadcast_loop(self):
+        while not self._stop.wait(self._interval):
+            mudou = self._metrics.diff()
+            if not mudou:
+                continue
+            data = self._frame(mudou)
+            with self._clients_lock:
+                clientes = list(self._clients)
+            for fila in clientes:
+                try:
+                    fila.put_nowait(data)
+                except queue.Full:
+                    # Cliente lento: descarta o diff mais antigo.
+                    try:
+                        fila.get_nowait()
+                        fila.put_nowait(data)
+                    except (queue.Empty, queue.Full):
+                        pass
+
+    def clients(self) -> int:
+        with self._clients_lock:
+            return len(self._clients)
+
+    def start(self):
+        self._metrics.diff()  # linha de base: clientes recebem o snapshot completo ao conectar
+        for target, name in ((self._httpd.serve_forever, "dashboard-http"), (self._broadcast_loop, "dashboard-tick")):
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("Dashboard em http://%s:%d (SSE em /events)", self._httpd.server_address[0], self.port)
+
+    def stop(self):
+        self._stop.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def start_from_config(metrics: LiveMetrics, config) -> Optional[DashboardServer]:
+    """Inicia o dashboard conforme `dashboard_port` (0 desativa) e `dashboard_hz` de `AppConfig`."""
+    port = config.dashboard_port
+    if port <= 0:
+        return None
+    try:
+        server = DashboardServer(metrics, port=port, tick_hz=config.dashboard_hz)
+    except OSError as e:
+        logger.warning("Dashboard indisponível na porta %d: %s", port, e)
+        return None
+    server.start()
+    return server
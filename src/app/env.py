@@ -0,0 +1,211 @@
+""""""
+from __future__ import annotations
+import io
+import multiprocessing as mp
+import numbers
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pyboy import PyBoy
+from pyboy.utils import WindowEvent
+
+from app.config import load_config
+from app.constants import MEM_X_POS, MEM_Y_POS, MEM_BATTLE
+
+OBS_ADDRESSES = (MEM_X_POS, MEM_Y_POS, MEM_BATTLE)
+OBS_SIZE = len(OBS_ADDRESSES)
+
+ACTIONS = ('NOOP', 'UP', 'DOWN', 'LEFT', 'RIGHT', 'A', 'B', 'START', 'SELECT')
+_EVENTS = {
+    'UP': (WindowEvent.PRESS_ARROW_UP, WindowEvent.RELEASE_ARROW_UP),
+    'DOWN': (WindowEvent.PRESS_ARROW_DOWN, WindowEvent.RELEASE_ARROW_DOWN),
+    'LEFT': (WindowEvent.PRESS_ARROW_LEFT, WindowEvent.RELEASE_ARROW_LEFT),
+    'RIGHT': (WindowEvent.PRESS_ARROW_RIGHT, WindowEvent.RELEASE_ARROW_RIGHT),
+    'A': (WindowEvent.PRESS_BUTTON_A, WindowEvent.RELEASE_BUTTON_A),
+    'B': (WindowEvent.PRESS_BUTTON_B, WindowEvent.RELEASE_BUTTON_B),
+    'START': (WindowEvent.PRESS_BUTTON_START, WindowEvent.RELEASE_BUTTON_START),
+    'SELECT': (WindowEvent.PRESS_BUTTON_SELECT, WindowEvent.RELEASE_BUTTON_SELECT),
+}
+
+# O jogo lê o joypad uma vez por frame: pressionar e soltar no mesmo frame é ignorado.
+MIN_BUTTON_FRAMES = 2
+DEFAULT_FRAMES = 25
+
+Action = Union[int, str]
+RewardFn = Callable[[np.ndarray, np.ndarray], float]
+
+
+def _action_name(action: Action) -> str:
+    # numbers.Integral cobre int e inteiros do NumPy (np.int64 etc.), comuns em políticas vetorizadas.
+    if isinstance(action, numbers.Integral):
+        if not 0 <= action < len(ACTIONS):
+            raise ValueError(f"Ação desconhecida: {action}")
+        return ACTIONS[int(action)]
+    if isinstance(action, str) and (action in _EVENTS or action == 'NOOP'):
+        return str(action)
+    raise ValueError(f"Ação desconhecida: {action!r}")
+
+
+def _check_frames(name: str, frames: int):
+    if frames < 1:
+        raise ValueError(f"frames deve ser >= 1, recebido {frames}")
+    if name != 'NOOP' and frames < MIN_BUTTON_FRAMES:
+        raise ValueError(f"{name} exige frames >= {MIN_BUTTON_FRAMES} (pressionar e soltar em frames distintos)")
+
+
+class PyBoyEnv:
+    """Ambiente estilo Gym sobre o PyBoy, observando os endereços de RAM de `app.constants`.
+
+    A observação é um vetor uint8 `[x, y, batalha]`. `reset()` recarrega um
+    estado salvo em memória (de `state_path` ou capturado após `boot_frames`),
+    sem reabrir a ROM. Os frames rodam sem renderização nem janela.
+    """
+
+    def __init__(self, rom_path: Optional[str] = None, state_path: Optional[str] = None, frames: int = DEFAULT_FRAMES,
+                 press_frames: int = 15, boot_frames: int = 0, max_steps: Optional[int] = None,
+                 reward_fn: Optional[RewardFn] = None):
+        self._pyboy = PyBoy(rom_path or load_config().rom_path, window="null", sound_emulated=False)
+        self._pyboy.set_emulation_speed(0)
+        self._memory = self._pyboy.memory
+        self.frames = frames
+        self.press_frames = press_frames
+        self.max_steps = max_steps
+        self._reward_fn = reward_fn
+        if state_path:
+            with open(state_path, "rb") as f:
+                self._pyboy.load_state(f)
+        elif boot_frames:
+            self._pyboy.tick(boot_frames, False)
+        buf = io.BytesIO()
+        self._pyboy.save_state(buf)
+        self._state = buf.getvalue()
+        self._obs = np.zeros(OBS_SIZE, dtype=np.uint8)
+        self._steps = 0
+
+    def _observe(self, out: np.ndarray) -> np.ndarray:
+        mem = self._memory
+        for i, addr in enumerate(OBS_ADDRESSES):
+            out[i] = mem[addr]
+        return out
+
+    def reset(self) -> np.ndarray:
+        self._pyboy.load_state(io.BytesIO(self._state))
+        self._steps = 0
+        return self._observe(self._obs).copy()
+
+    def step(self, action: Action, frames: Optional[int] = None) -> Tuple[np.ndarray, float, bool, Dict]:
+        frames = self.frames if frames is None else frames
+        name = _action_name(action)
+        _check_frames(name, frames)
+        pyboy = self._pyboy
+        events = _EVENTS.get(name)
+        if events:
+            press = max(1, min(self.press_frames, frames - 1))
+            pyboy.send_input(events[0])
+            pyboy.tick(press, False)
+            pyboy.send_input(events[1])
+            pyboy.tick(frames - press, False)
+        else:
+            pyboy.tick(frames, False)
+        prev = self._obs.copy()
+        obs = self._observe(self._obs)
+        self._steps += 1
+        info = {
+            'passo': bool(obs[0] != prev[0] or obs[1] != prev[1]),
+            'batalha': bool(obs[2] != 0 and prev[2] == 0),
+        }
+        reward = float(self._reward_fn(prev, obs)) if self._reward_fn else 0.0
+        done = self.max_steps is not None and self._steps >= self.max_steps
+        return obs.copy(), reward, done, info
+
+    def close(self):
+        self._pyboy.stop(save=False)
+
+
+def _worker(conn, shm_name: str, index: int, env_kwargs: Dict):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    row = np.ndarray((OBS_SIZE,), dtype=np.uint8, buffer=shm.buf, offset=index * OBS_SIZE)
+    env = PyBoyEnv(**env_kwargs)
+    try:
+        while True:
+            cmd, *args = conn.recv()
+            if cmd == 'step':
+                obs, reward, done, info = env.step(*args)
+                if done:
+                    obs = env.reset()
+                row[:] = obs
+                conn.send((reward, done, info))
+            elif cmd == 'reset':
+                row[:] = env.reset()
+                conn.send(None)
+            elif cmd == 'close':
+                break
+    finally:
+        env.close()
+        del row
+        shm.close()
+        conn.close()
+
+
+class VecEnv:
+    """Vários `PyBoyEnv` em subprocessos; observações num buffer compartilhado `(n, OBS_SIZE)`.
+
+    Os episódios terminados são reiniciados automaticamente dentro do worker.
+    """
+
+    def __init__(self, n_envs: int, **env_kwargs):
+        ctx = mp.get_context("spawn")
+        self.n_envs = n_envs
+        self.frames = env_kwargs.get('frames', DEFAULT_FRAMES)
+        self._shm = shared_memory.SharedMemory(create=True, size=n_envs * OBS_SIZE)
+        self._obs = np.ndarray((n_envs, OBS_SIZE), dtype=np.uint8, buffer=self._shm.buf)
+        self._conns = []
+        self._procs = []
+        for i in range(n_envs):
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_worker, args=(child, self._shm.name, i, env_kwargs), daemon=True)
+            p.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(p)
+        self._closed = False
+
+    def reset(self) -> np.ndarray:
+        for c in self._conns:
+            c.send(('reset',))
+        for c in self._conns:
+            c.recv()
+        return self._obs.copy()
+
+    def step(self, actions: Sequence[Action], frames: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        # Valida no processo principal: uma ação inválida não derruba o worker.
+        names = [_action_name(a) for a in actions]
+        if len(names) != len(self._conns):
+            raise ValueError(f"Esperadas {len(self._conns)} ações, recebidas {len(names)}")
+        for name in names:
+            _check_frames(name, self.frames if frames is None else frames)
+        for c, name in zip(self._conns, names):
+            c.send(('step', name, frames))
+        results = [c.recv() for c in self._conns]
+        rewards = np.array([r[0] for r in results], dtype=np.float32)
+        dones = np.array([r[1] for r in results], dtype=bool)
+        infos = [r[2] for r in results]
+        return self._obs.copy(), rewards, dones, infos
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for c in self._conns:
+            try:
+                c.send(('close',))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self._obs = None
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,50 @@
+""""""
+from __future__ import annotations
+import os
+import socket
+import time
+from typing import Callable, Optional
+
+READY_ENV = "PYBOY_READY_FILE"
+# Índice da réplica (1..N) definido pelo supervisor quando há mais de uma instância.
+REPLICA_ENV = "PYBOY_REPLICA"
+
+
+def mark_ready() -> None:
+    """Sinaliza ao supervisor que o processo está pronto (arquivo em `PYBOY_READY_FILE`)."""
+    path = os.environ.get(READY_ENV)
+    if not path:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+    except OSError:
+        pass
+
+
+def replica_id() -> Optional[int]:
+    value = os.environ.get(REPLICA_ENV)
+    return int(value) if value else None
+
+
+def is_ready(path: str) -> bool:
+    return os.path.exists(path)
+
+
+def broker_reachable(host: Optional[str] = None, port: int = 5672, timeout: float = 1.0) -> bool:
+    host = host or os.environ.get("RABBITMQ_HOST", "127.0.0.1")
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_until(probe: Callable[[], bool], timeout: float, interval: float = 0.1) -> bool:
+    deadline = time.monotonic() + timeout
+    while True:
+        if probe():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
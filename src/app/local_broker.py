@@ -0,0 +1,118 @@
+""""""
+from __future__ import annotations
+import threading
+from collections import deque
+from types import SimpleNamespace
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.messaging import message_age, queue_arguments, sent_at_headers
+
+
+class _LocalQueue:
+    def __init__(self, arguments: Dict[str, object]):
+        self.max_length = arguments.get("x-max-length")
+        self.overflow = arguments.get("x-overflow", "drop-head")
+        ttl = arguments.get("x-message-ttl")
+        self.ttl = ttl / 1000.0 if ttl else None
+        self.items: Deque[Tuple[str, Dict[str, object]]] = deque()
+        self.dropped = 0
+
+
+class LocalBroker:
+    """Broker em memória que imita as regras de fila do RabbitMQ usadas pelo projeto.
+
+    Suporta `x-max-length` com `drop-head`/`reject-publish` e `x-message-ttl`.
+    Serve para testes e testes de carga sem um RabbitMQ real.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, _LocalQueue] = {}
+        self._cond = threading.Condition()
+
+    def declare(self, name: str, arguments: Optional[Dict[str, object]] = None):
+        with self._cond:
+            if name not in self._queues:
+                self._queues[name] = _LocalQueue(arguments or {})
+
+    def put(self, name: str, body: str, headers: Dict[str, object]) -> bool:
+        with self._cond:
+            q = self._queues[name]
+            if q.max_length and len(q.items) >= q.max_length:
+                q.dropped += 1
+                if q.overflow == "reject-publish":
+                    return False
+                q.items.popleft()
+            q.items.append((body, headers))
+            self._cond.notify_all()
+            return True
+
+    def get(self, name: str) -> Optional[Tuple[str, Dict[str, object]]]:
+        with self._cond:
+            q = self._queues[name]
+            while q.items:
+                body, headers = q.items.popleft()
+                if q.ttl and message_age(SimpleNamespace(headers=headers)) > q.ttl:
+                    q.dropped += 1
+                    continue
+                return body, headers
+            return None
+
+    def depth(self, name: str) -> int:
+        with self._cond:
+            return len(self._queues[name].items)
+
+    def dropped(self, name: str) -> int:
+        with self._cond:
+            return self._queues[name].dropped
+
+    def wait(self, names: List[str], timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: any(self._queues[n].items for n in names), timeout=timeout)
+
+
+class LocalClient:
+    """Mesma interface de `RabbitMQClient`, sobre um `LocalBroker`."""
+
+    def __init__(self, broker: LocalBroker):
+        self._broker = broker
+        self._consumers: Dict[str, Tuple[Callable[[str], None], Optional[float]]] = {}
+        self.stale_dropped = 0
+
+    def connect(self):
+        pass
+
+    def declare_queue(self, name: str, max_length: Optional[int] = None, overflow: str = "drop-head",
+                      message_ttl_ms: Optional[int] = None):
+        self._broker.declare(name, queue_arguments(max_length, overflow, message_ttl_ms))
+
+    def queue_depth(self, name: str) -> int:
+        return self._broker.depth(name)
+
+    def publish(self, queue: str, body: str):
+        self._broker.put(queue, body, sent_at_headers())
+
+    def consume(self, queue: str, callback: Callable[[str], None], max_age: Optional[float] = None):
+        self._consumers[queue] = (callback, max_age)
+
+    def set_max_age(self, queue: str, max_age: Optional[float]):
+        callback, _ = self._consumers[queue]
+        self._consumers[queue] = (callback, max_age)
+
+    def process_data_events(self, time_limit=0):
+        if time_limit and not self._broker.wait(list(self._consumers), time_limit):
+            return
+        for queue, (callback, max_age) in self._consumers.items():
+            # Entrega só o que já estava na fila, como uma rodada de I/O do pika.
+            for _ in range(self._broker.depth(queue)):
+                item = self._broker.get(queue)
+                if item is None:
+                    break
+                body, headers = item
+                age = message_age(SimpleNamespace(headers=headers)) if max_age else None
+                if age is not None and age > max_age:
+                    self.stale_dropped += 1
+                    continue
+                callback(body)
+
+    def close(self):
+        self._consumers.clear()
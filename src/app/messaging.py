@@ -3,16 +3,84 @@ from __future__ import annotations
 import pika
 import logging
 import os
-from typing import Callable, Optional
+import time
+from typing import Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+
+def queue_arguments(max_length: Optional[int] = None, overflow: str = "drop-head",
+                    message_ttl_ms: Optional[int] = None) -> Dict[str, object]:
+    """Argumentos `x-*` do RabbitMQ; `overflow` é `drop-head` (descarta o mais antigo) ou `reject-publish`."""
+    args: Dict[str, object] = {}
+    if max_length:
+        args["x-max-length"] = max_length
+        args["x-overflow"] = overflow
+    if message_ttl_ms:
+        args["x-message-ttl"] = message_ttl_ms
+    return args
+
+
+def declare_with_fallback(connection, channel, name: str, arguments: Dict[str, object]):
+    """Declara `name` com `arguments`; devolve o canal a usar daí em diante.
+
+    Se a fila já existe com outros argumentos (ex: `steps_max_length` mudou), o
+    RabbitMQ fecha o canal com 406. Nesse caso a fila existente é usada como
+    está, num canal novo, e o log explica como aplicar o novo limite.
+    """
+    try:
+        channel.queue_declare(queue=name, arguments=arguments or None)
+        return channel
+    except pika.exceptions.ChannelClosedByBroker as e:
+        if e.reply_code != 406:
+            raise
+        logger.warning("Fila %s já existe com outros argumentos; usando a existente sem %s. "
+                       "Para aplicar, apague a fila (rabbitmqctl delete_queue %s) e reinicie. (%s)",
+                       name, arguments, name, e.reply_text)
+        channel = connection.channel()
+        channel.queue_declare(queue=name, passive=True)
+        return channel
+
+
+SENT_AT_HEADER = "sent_at_ms"
+
+
+def sent_at_headers() -> Dict[str, int]:
+    # Inteiro em ms: o pika não codifica floats em headers AMQP.
+    return {SENT_AT_HEADER: int(time.time() * 1000)}
+
+
+def message_age(properties) -> Optional[float]:
+    headers = getattr(properties, "headers", None) or {}
+    sent_at = headers.get(SENT_AT_HEADER)
+    if sent_at is None:
+        return None
+    return time.time() - sent_at / 1000.0
+
+
+class FlowControl:
+    """Histerese sobre a profundidade da fila: pausa em `high`, retoma em `low`."""
+
+    def __init__(self, high: int, low: Optional[int] = None):
+        self.high = high
+        self.low = high // 2 if low is None else low
+        self.paused = False
+
+    def allow(self, depth: int) -> bool:
+        if self.paused and depth <= self.low:
+            self.paused = False
+        elif not self.paused and depth >= self.high:
+            self.paused = True
+        return not self.paused
+
 class RabbitMQClient:
     def __init__(self, host: str = None):
         default_host = os.environ.get("RABBITMQ_HOST", "127.0.0.1")
         self._host = host or default_host
         self._connection: Optional[pika.BlockingConnection] = None
         self._channel: Optional[pika.channel.Channel] = None
+        self.stale_dropped = 0
+        self._max_age: Dict[str, Optional[float]] = {}
 
     def connect(self):
         if self._connection and self._connection.is_open:
@@ -38,21 +106,36 @@ class RabbitMQClient:
             self.connect()
         return self._channel
 
-    def declare_queue(self, name: str):
+    def declare_queue(self, name: str, max_length: Optional[int] = None, overflow: str = "drop-head",
+                      message_ttl_ms: Optional[int] = None):
+        ch = self.channel
+        args = queue_arguments(max_length, overflow, message_ttl_ms)
+        self._channel = declare_with_fallback(self._connection, ch, name, args)
+        logger.debug("Fila declarada: %s %s", name, args)
+
+    def queue_depth(self, name: str) -> int:
         ch = self.channel
-        ch.queue_declare(queue=name)
-        logger.debug("Fila declarada: %s", name)
+        return ch.queue_declare(queue=name, passive=True).method.message_count
 
     def publish(self, queue: str, body: str):
         ch = self.channel
-        ch.basic_publish(exchange="", routing_key=queue, body=body)
+        props = pika.BasicProperties(headers=sent_at_headers())
+        ch.basic_publish(exchange="", routing_key=queue, body=body, properties=props)
         logger.debug("Publicado em %s: %s", queue, body)
 
-    def consume(self, queue: str, callback: Callable[[str], None]):
+    def consume(self, queue: str, callback: Callable[[str], None], max_age: Optional[float] = None):
+        """Consome `queue`; com `max_age` (s), mensagens mais velhas são confirmadas e descartadas."""
         ch = self.channel
+        self._max_age[queue] = max_age
 
         def _wrapper(ch_, method, properties, body):
             try:
+                limit = self._max_age.get(queue)
+                age = message_age(properties) if limit else None
+                if age is not None and age > limit:
+                    self.stale_dropped += 1
+                    logger.debug("Descartada mensagem velha (%.2fs) em %s", age, queue)
+                    return
                 msg = body.decode()
                 callback(msg)
             finally:
@@ -61,6 +144,9 @@ class RabbitMQClient:
         ch.basic_consume(queue=queue, on_message_callback=_wrapper)
         logger.info("Consumindo fila: %s", queue)
 
+    def set_max_age(self, queue: str, max_age: Optional[float]):
+        self._max_age[queue] = max_age
+
     def process_data_events(self, time_limit=0):
         if self._connection:
             self._connection.process_data_events(time_limit=time_limit)
@@ -0,0 +1,303 @@
+""""""
+from __future__ import annotations
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+CATEGORIAS = {
+    'movimento': {'UP', 'DOWN', 'LEFT', 'RIGHT'},
+    'botao': {'A', 'B', 'START', 'SELECT'},
+    'velocidade': {'TURBO', 'NORMAL', 'LENTO'},
+    'audio': {'VOL+', 'VOL-', 'MUTE', 'UNMUTE'},
+}
+_CATEGORIA_DE = {cmd: cat for cat, cmds in CATEGORIAS.items() for cmd in cmds}
+SERIE_CAMPOS = ('minuto', 'passos', 'batalhas', 'comandos')
+FORMATOS = ('txt', 'json', 'csv', 'parquet')
+
+
+class SessionStats:
+    """Contadores da sessão mantidos incrementalmente, com série por minuto.
+
+    Cada evento custa O(1); `resumo()` só combina os agregados, então o
+    relatório não depende da duração da sessão.
+    """
+
+    def __init__(self, inicio: Optional[datetime] = None, clock: Callable[[], float] = time.monotonic):
+        self.inicio = inicio or datetime.now()
+        self._clock = clock
+        self._t0 = clock()
+        self.passos = 0
+        self.batalhas = 0
+        self.comandos_total = 0
+        self.por_categoria = {cat: 0 for cat in CATEGORIAS}
+        self.por_comando: Counter = Counter()
+        self._serie: Dict[int, List[int]] = {}
+
+    def elapsed(self) -> float:
+        """Segundos desde o início da sessão, no relógio de `clock`."""
+        return self._clock() - self._t0
+
+    def _minuto(self) -> List[int]:
+        m = int((self._clock() - self._t0) // 60)
+        bucket = self._serie.get(m)
+        if bucket is None:
+            bucket = self._serie[m] = [0, 0, 0]
+        return bucket
+
+    def record_step(self):
+        self.passos += 1
+        self._minuto()[0] += 1
+
+    def record_battle(self):
+        self.batalhas += 1
+        self._minuto()[1] += 1
+
+    def record_command(self, comando: str):
+        self.comandos_total += 1
+        self.por_comando[comando] += 1
+        cat = _CATEGORIA_DE.get(comando)
+        if cat:
+            self.por_categoria[cat] += 1
+        self._minuto()[2] += 1
+
+    def serie(self) -> List[Dict[str, int]]:
+        return [dict(zip(SERIE_CAMPOS, (m, *v))) for m, v in sorted(self._serie.items())]
+
+    def resumo(self, fim: Optional[datetime] = None) -> Dict[str, object]:
+        fim = fim or datetime.now()
+        segundos = max(0.0, (fim - self.inicio).total_seconds())
+        minutos = segundos / 60
+        passos, batalhas, total = self.passos, self.batalhas, self.comandos_total
+        return {
+            'inicio': self.inicio,
+            'fim': fim,
+            'duracao_s': segundos,
+            'passos': passos,
+            'batalhas': batalhas,
+            'passos_por_minuto': passos / minutos if minutos > 0 else 0.0,
+            'taxa_batalha': batalhas / passos * 100 if passos else 0.0,
+            'passos_por_batalha': passos / batalhas if batalhas else None,
+            'comandos_total': total,
+            'comandos_por_categoria': dict(self.por_categoria),
+            'comandos_por_minuto': total / minutos if minutos > 0 else 0.0,
+            'top_comandos': self.por_comando.most_common(5),
+            'comandos_detalhados': dict(self.por_comando),
+        }
+
+
+def render_text(r: Dict[str, object]) -> str:
+    fim: datetime = r['fim']
+    inicio: datetime = r['inicio']
+    linhas = [
+        "="*60,
+        "📊 RELATÓRIO FINAL DA SESSÃO - POKÉMON RED EMULATOR",
+        "="*60,
+        f"📅 Data/Hora Final: {fim.strftime('%d/%m/%Y %H:%M:%S')}",
+        ""
+    ]
+
+    segundos = int(r['duracao_s'])
+    linhas.extend([
+        "⏱️  TEMPO DE SESSÃO",
+        "-" * 60,
+        f"   Início:   {inicio.strftime('%d/%m/%Y %H:%M:%S')}",
+        f"   Término:  {fim.strftime('%d/%m/%Y %H:%M:%S')}",
+        f"   Duração:  {segundos // 3600}h {segundos % 3600 // 60}m {segundos % 60}s",
+        ""
+    ])
+
+    linhas.extend([
+        "🚶 MOVIMENTO E EXPLORAÇÃO",
+        "-" * 60,
+        f"   👣 Total de Passos:       {r['passos']:,}",
+        f"   📍 Distância Percorrida:  ~{r['passos']} tiles",
+    ])
+    if r['passos_por_minuto'] > 0:
+        linhas.append(f"   🏃 Ritmo de Jogo:         {r['passos_por_minuto']:.1f} passos/min")
+    linhas.append("")
+
+    linhas.extend([
+        "⚔️  BATALHAS",
+        "-" * 60,
+        f"   🎯 Batalhas Iniciadas:    {r['batalhas']}",
+    ])
+    if r['passos'] > 0:
+        linhas.append(f"   📊 Taxa de Encontros:     {r['taxa_batalha']:.2f}% (batalhas/100 passos)")
+        if r['passos_por_batalha'] is not None:
+            linhas.append(f"   📈 Média:                 1 batalha a cada {r['passos_por_batalha']:.1f} passos")
+    linhas.append("")
+
+    total = r['comandos_total']
+    if total > 0:
+        cats = r['comandos_por_categoria']
+        linhas.extend([
+            "🎮 COMANDOS EXECUTADOS",
+            "-" * 60,
+            f"   📊 Total de Comandos:     {total:,}",
+            f"      • Movimento:          {cats['movimento']} ({cats['movimento'] / total * 100:.1f}%)",
+            f"      • Botões (A/B):       {cats['botao']} ({cats['botao'] / total * 100:.1f}%)",
+            f"      • Velocidade:         {cats['velocidade']} ({cats['velocidade'] / total * 100:.1f}%)",
+            f"      • Áudio:              {cats['audio']} ({cats['audio'] / total * 100:.1f}%)",
+            "",
+            "   🏆 Top 5 Comandos Mais Usados:",
+        ])
+        for i, (cmd, count) in enumerate(r['top_comandos'], 1):
+            linhas.append(f"      {i}. {cmd:8} → {count:4} vezes")
+        linhas.append("")
+
+        if r['comandos_por_minuto'] > 0:
+            linhas.extend([
+                "⚡ PERFORMANCE",
+                "-" * 60,
+                f"   🎯 Comandos/minuto:       {r['comandos_por_minuto']:.1f}",
+                f"   🎮 APM (Actions/min):     {r['comandos_por_minuto']:.0f}",
+                ""
+            ])
+
+    linhas.extend([
+        "="*60,
+        "✅ Fim da execução - Sessão encerrada com sucesso!",
+        "="*60
+    ])
+    return '\n'.join(linhas)
+
+
+def render_json(r: Dict[str, object], serie: List[Dict[str, int]]) -> str:
+    dados = dict(r, inicio=r['inicio'].isoformat(), fim=r['fim'].isoformat(), serie_por_minuto=serie)
+    return json.dumps(dados, ensure_ascii=False, indent=2)
+
+
+def render_csv(serie: List[Dict[str, int]]) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=SERIE_CAMPOS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(serie)
+    return buf.getvalue()
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp cria com 0600; os relatórios devem ter as permissões de um open() comum.
+_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def _replace_atomic(path: str, gravar: Callable[[str], None]):
+    # Temporário único no mesmo diretório: processos concorrentes não disputam o mesmo arquivo
+    # e `os.replace` continua atômico (mesmo sistema de arquivos).
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                               dir=os.path.dirname(path) or ".")
+    os.close(fd)
+    try:
+        gravar(tmp)
+        os.chmod(tmp, _FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_atomic(path: str, conteudo: str):
+    """Grava via arquivo temporário + `os.replace`, para nunca deixar um relatório pela metade."""
+    def gravar(tmp: str):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+    _replace_atomic(path, gravar)
+
+
+def write_parquet(serie: List[Dict[str, int]], path: str):
+    if pa is None:
+        raise RuntimeError("pyarrow não instalado; exportação parquet indisponível")
+    tabela = pa.table({campo: [linha[campo] for linha in serie] for campo in SERIE_CAMPOS})
+    _replace_atomic(path, lambda tmp: pq.write_table(tabela, tmp))
+
+
+def parse_formats(value: str) -> List[str]:
+    formatos = [f.strip().lower() for f in value.split(',') if f.strip()]
+    invalidos = [f for f in formatos if f not in FORMATOS]
+    if invalidos:
+        raise ValueError(f"Formatos de relatório inválidos: {', '.join(invalidos)}")
+    return formatos
+
+
+def export(stats: SessionStats, base: str, formatos: Iterable[str], fim: Optional[datetime] = None) -> List[str]:
+    """Grava `base.txt`, `base.json`, `base_serie.csv` e/ou `base_serie.parquet`; devolve os caminhos."""
+    r = stats.resumo(fim)
+    serie = stats.serie()
+    gravados = []
+    for formato in formatos:
+        try:
+            if formato == 'txt':
+                path = f"{base}.txt"
+                write_atomic(path, render_text(r))
+            elif formato == 'json':
+                path = f"{base}.json"
+                write_atomic(path, render_json(r, serie))
+            elif formato == 'csv':
+                path = f"{base}_serie.csv"
+                write_atomic(path, render_csv(serie))
+            elif formato == 'parquet':
+                path = f"{base}_serie.parquet"
+                write_parquet(serie, path)
+            else:
+                continue
+            gravados.append(path)
+        except (OSError, RuntimeError) as e:
+            logger.warning("Falha ao exportar %s: %s", formato, e)
+    return gravados
+
+
+class Checkpointer:
+    """Exporta a sessão periodicamente para `base` (sobrescrito a cada checkpoint)."""
+
+    def __init__(self, stats: SessionStats, base: str, intervalo: float, formatos: Iterable[str] = ('json', 'csv'),
+                 clock: Callable[[], float] = time.monotonic):
+        self._stats = stats
+        self._base = base
+        self.intervalo = intervalo
+        self.formatos = list(formatos)
+        self._clock = clock
+        self._ultimo = clock()
+        self._gravados: set = set()
+
+    def maybe_write(self) -> bool:
+        if self.intervalo <= 0 or self._clock() - self._ultimo < self.intervalo:
+            return False
+        self.write()
+        return True
+
+    def write(self):
+        self._ultimo = self._clock()
+        self._gravados.update(export(self._stats, self._base, self.formatos))
+        logger.debug("Checkpoint gravado em %s", self._base)
+
+    def discard(self):
+        """Remove os checkpoints deste processo (após o relatório final ter sido gravado)."""
+        for path in self._gravados:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning("Falha ao remover checkpoint %s: %s", path, e)
+        self._gravados.clear()
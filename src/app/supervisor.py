@@ -0,0 +1,213 @@
+""""""
+from __future__ import annotations
+import logging
+import os
+import signal
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set
+
+from app.health import READY_ENV, is_ready
+
+logger = logging.getLogger(__name__)
+
+RESTART_POLICIES = {"always", "on-failure", "never"}
+
+
+@dataclass
+class ProcessSpec:
+    name: str
+    argv: List[str]
+    restart: str = "on-failure"
+    cpus: Optional[Set[int]] = None
+    env: Dict[str, str] = field(default_factory=dict)
+    new_console: bool = False
+
+    def __post_init__(self):
+        if self.restart not in RESTART_POLICIES:
+            raise ValueError(f"Política de restart inválida: {self.restart}")
+
+
+@dataclass
+class _Managed:
+    spec: ProcessSpec
+    ready_file: str
+    proc: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    ready_at: Optional[float] = None
+    restarts: int = 0
+    backoff: float = 0.0
+    next_start: Optional[float] = None
+    finished: bool = False
+
+
+def set_affinity(pid: int, cpus: Set[int]) -> bool:
+    """Fixa o processo nas CPUs dadas (sched_setaffinity ou psutil, se instalado)."""
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, cpus)
+            return True
+        except OSError as e:
+            logger.warning("Falha ao definir afinidade de CPU (pid %d): %s", pid, e)
+            return False
+    try:
+        import psutil
+        psutil.Process(pid).cpu_affinity(sorted(cpus))
+        return True
+    except Exception as e:
+        logger.warning("Afinidade de CPU indisponível (pid %d): %s", pid, e)
+        return False
+
+
+def parse_cpus(value: Optional[str]) -> Optional[Set[int]]:
+    if not value:
+        return None
+    cpus: Set[int] = set()
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            a, b = part.split("-", 1)
+            cpus.update(range(int(a), int(b) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus or None
+
+
+def kill_process(proc: subprocess.Popen):
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            proc.terminate()
+        for _ in range(10):
+            if proc.poll() is not None:
+                return
+            time.sleep(0.1)
+
+        if os.name == 'nt':
+            subprocess.run(["taskkill", "/PID", str(proc.pid), "/T", "/F"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            proc.kill()
+    except Exception:
+        pass
+
+
+class Supervisor:
+    """Inicia processos em paralelo, aguarda sinais de prontidão e reinicia com backoff exponencial.
+
+    Cada processo recebe `PYBOY_READY_FILE`; ele chama `app.health.mark_ready()`
+    quando está pronto (conectado, filas declaradas, primeiro frame etc.).
+    """
+
+    def __init__(self, specs: Sequence[ProcessSpec], backoff_initial: float = 1.0, backoff_max: float = 30.0,
+                 stable_after: float = 60.0, shutdown_on_exit: bool = True):
+        self._dir = tempfile.mkdtemp(prefix="pyboy_ready_")
+        self._procs = [_Managed(spec=s, ready_file=os.path.join(self._dir, f"{i}_{s.name}.ready"))
+                       for i, s in enumerate(specs)]
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._stable_after = stable_after
+        self._shutdown_on_exit = shutdown_on_exit
+        self._t0 = 0.0
+        self.stopping = False
+
+    @property
+    def processes(self) -> List[_Managed]:
+        return self._procs
+
+    def _spawn(self, m: _Managed):
+        if os.path.exists(m.ready_file):
+            os.remove(m.ready_file)
+        env = dict(os.environ)
+        env.update(m.spec.env)
+        env[READY_ENV] = m.ready_file
+        creationflags = 0
+        if os.name == 'nt' and m.spec.new_console:
+            creationflags = subprocess.CREATE_NEW_CONSOLE
+        m.proc = subprocess.Popen(m.spec.argv, env=env, creationflags=creationflags)
+        m.started_at = time.monotonic()
+        m.ready_at = None
+        m.next_start = None
+        if m.spec.cpus:
+            if set_affinity(m.proc.pid, m.spec.cpus):
+                logger.info("%s fixado nas CPUs %s", m.spec.name, sorted(m.spec.cpus))
+        logger.info("Iniciado %s (pid %d)", m.spec.name, m.proc.pid)
+
+    def start(self, ready_timeout: float = 60.0) -> Optional[float]:
+        """Inicia todos e aguarda prontidão; devolve o tempo até todos prontos (None se expirar)."""
+        self._t0 = time.monotonic()
+        for m in self._procs:
+            self._spawn(m)
+        deadline = self._t0 + ready_timeout
+        while time.monotonic() < deadline and not self.stopping:
+            self.poll_once()
+            pendentes = [m for m in self._procs if m.ready_at is None and not m.finished]
+            if not pendentes:
+                total = time.monotonic() - self._t0
+                logger.info("Todos prontos em %.2fs", total)
+                return total
+            time.sleep(0.05)
+        faltando = [m.spec.name for m in self._procs if m.ready_at is None]
+        logger.warning("Prontidão não confirmada em %.0fs: %s", ready_timeout, ", ".join(faltando))
+        return None
+
+    def poll_once(self):
+        now = time.monotonic()
+        for m in self._procs:
+            if m.finished:
+                continue
+            if m.proc is None:
+                if m.next_start is not None and now >= m.next_start:
+                    self._spawn(m)
+                continue
+            code = m.proc.poll()
+            if code is None:
+                if m.ready_at is None and is_ready(m.ready_file):
+                    m.ready_at = now
+                    logger.info("%s pronto em %.2fs", m.spec.name, now - m.started_at)
+                if m.backoff and m.ready_at is not None and now - m.started_at >= self._stable_after:
+                    m.backoff = 0.0
+                continue
+            self._on_exit(m, code, now)
+
+    def _on_exit(self, m: _Managed, code: int, now: float):
+        m.proc = None
+        policy = m.spec.restart
+        if policy == "always" or (policy == "on-failure" and code != 0):
+            m.backoff = min(m.backoff * 2, self._backoff_max) if m.backoff else self._backoff_initial
+            m.next_start = now + m.backoff
+            m.restarts += 1
+            logger.warning("%s terminou (código %s); reiniciando em %.1fs", m.spec.name, code, m.backoff)
+            return
+        m.finished = True
+        logger.info("%s terminou (código %s)", m.spec.name, code)
+        if self._shutdown_on_exit:
+            logger.info("Processo %s não será reiniciado; encerrando o restante.", m.spec.name)
+            self.stopping = True
+
+    def run(self, poll_interval: float = 0.5):
+        while not self.stopping:
+            self.poll_once()
+            time.sleep(poll_interval)
+
+    def send_signal(self, sig: int):
+        for m in self._procs:
+            if m.proc is not None and m.proc.poll() is None:
+                m.proc.send_signal(sig)
+
+    def stop(self):
+        self.stopping = True
+        for m in self._procs:
+            if m.proc is not None:
+                kill_process(m.proc)
+        for m in self._procs:
+            if os.path.exists(m.ready_file):
+                os.remove(m.ready_file)
+        try:
+            os.rmdir(self._dir)
+        except OSError:
+            pass
@@ -2,6 +2,8 @@
 from __future__ import annotations
 import os
 import sys
+import threading
+import time
 from typing import Optional
 
 try:
@@ -10,76 +12,224 @@ try:
 except Exception:
     AudioUtilities = None
     ISimpleAudioVolume = None
+    comtypes = None
 
 
-class VolumeService:
-    def __init__(self, initial_percent: int = 50):
-        self._current_percent = max(0, min(100, initial_percent))
-        
-        self._last_non_zero = self._current_percent / 100.0 if self._current_percent > 0 else 0.0
+def _debug_enabled() -> bool:
+    return os.getenv("PYBOY_VOLUME_DEBUG", "0") in {"1", "true", "TRUE"}
+
+
+class VolumeBackend:
+    """Interface de backend: obtém o controle de volume e aplica níveis (0.0-1.0)."""
+
+    name = "base"
+    # False para backends que não alteram o volume real do processo.
+    real = True
+
+    def thread_init(self) -> None:
+        """Chamado na thread do worker antes de qualquer outra chamada ao backend."""
+
+    def thread_exit(self) -> None:
+        """Chamado na thread do worker ao encerrar."""
+
+    def acquire(self) -> bool:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        pass
+
+    def set_level(self, level: float) -> None:
+        raise NotImplementedError
+
+
+class PycawBackend(VolumeBackend):
+    name = "pycaw"
+
+    def __init__(self):
         self._iface = None
-        self._attempts = 0
-        self._max_attempts = 5
-        self._acquire_interface(initial_sync=True)
-        self._debug = os.getenv("PYBOY_VOLUME_DEBUG", "0") in {"1", "true", "TRUE"}
-        if self._debug:
-            print(f"[VolumeService] Inicializado (pycaw {'OK' if AudioUtilities else 'INDISPONÍVEL'})", file=sys.stderr)
 
-    def _get_interface(self):
+    def thread_init(self) -> None:
+        # O import do comtypes só inicializa COM na thread que importou; o worker precisa do seu.
+        comtypes.CoInitialize()
+
+    def thread_exit(self) -> None:
+        self._iface = None
+        comtypes.CoUninitialize()
+
+    def acquire(self) -> bool:
+        if self._iface is not None:
+            return True
         if AudioUtilities is None:
-            return None
+            return False
         try:
             pid = os.getpid()
             for session in AudioUtilities.GetAllSessions():
                 proc = session.Process
                 if proc and proc.pid == pid:
-                    return session._ctl.QueryInterface(ISimpleAudioVolume)
+                    self._iface = session._ctl.QueryInterface(ISimpleAudioVolume)
+                    return True
         except Exception:
-            return None
-        return None
+            self._iface = None
+        return False
 
-    def _acquire_interface(self, initial_sync: bool = False):
-        if self._iface is not None:
-            return
-        if self._attempts >= self._max_attempts:
-            if os.getenv("PYBOY_VOLUME_DEBUG", "0") in {"1", "true", "TRUE"}:
-                print(f"[VolumeService] Limite de tentativas atingido ({self._attempts})", file=sys.stderr)
-            return
+    def release(self) -> None:
+        self._iface = None
+
+    def set_level(self, level: float) -> None:
+        if self._iface is None:
+            raise RuntimeError("interface pycaw não adquirida")
+        self._iface.SetMasterVolume(level, None)
+
+
+class NullBackend(VolumeBackend):
+    """Backend sem efeito (Linux/sem pycaw); apenas registra o último nível aplicado."""
+
+    name = "null"
+    real = False
+
+    def __init__(self):
+        self.level: Optional[float] = None
+        self.applied = 0
+
+    def acquire(self) -> bool:
+        return True
+
+    def set_level(self, level: float) -> None:
+        self.level = level
+        self.applied += 1
+
+
+def default_backend() -> VolumeBackend:
+    if AudioUtilities is None:
+        return NullBackend()
+    return PycawBackend()
+
+
+class VolumeService:
+    """Volume lógico do processo com aplicação assíncrona no backend.
+
+    Os métodos públicos só atualizam o estado lógico e registram o alvo; uma
+    thread de fundo aplica apenas o alvo mais recente (rajadas de VOL+/VOL-
+    viram uma única chamada) e redescobre a interface com backoff exponencial.
+    """
+
+    BACKOFF_INITIAL = 0.5
+    BACKOFF_MAX = 30.0
+
+    def __init__(self, initial_percent: int = 50, backend: Optional[VolumeBackend] = None):
+        self._current_percent = max(0, min(100, initial_percent))
+
+        self._last_non_zero = self._current_percent / 100.0 if self._current_percent > 0 else 0.0
+        self._backend = backend if backend is not None else default_backend()
+        self._debug = _debug_enabled()
+        self._acquired = False
+        self._attempts = 0
+        self._backoff = self.BACKOFF_INITIAL
+        self._next_attempt = 0.0
+        self._pending: Optional[float] = None
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="VolumeService", daemon=True)
+        self._worker.start()
+        self._submit(self._current_percent / 100.0)
+        if self._debug:
+            print(f"[VolumeService] Inicializado (backend {self._backend.name})", file=sys.stderr)
+
+    def _submit(self, level: float):
+        with self._cond:
+            self._pending = level
+            self._cond.notify()
+
+    def _try_acquire(self) -> bool:
+        if self._acquired:
+            return True
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
         self._attempts += 1
-        iface = self._get_interface()
-        if iface:
-            self._iface = iface
-            if initial_sync:
-                try:
-                    self._iface.SetMasterVolume(self._current_percent / 100.0, None)
-                except Exception:
-                    self._iface = None
-            if os.getenv("PYBOY_VOLUME_DEBUG", "0") in {"1", "true", "TRUE"}:
-                print(f"[VolumeService] Interface pycaw obtida na tentativa {self._attempts}", file=sys.stderr)
-        else:
-            if os.getenv("PYBOY_VOLUME_DEBUG", "0") in {"1", "true", "TRUE"}:
-                print(f"[VolumeService] Falha em obter interface (tentativa {self._attempts})", file=sys.stderr)
+        if self._backend.acquire():
+            self._acquired = True
+            self._backoff = self.BACKOFF_INITIAL
+            if self._debug:
+                print(f"[VolumeService] Interface {self._backend.name} obtida na tentativa {self._attempts}", file=sys.stderr)
+            return True
+        self._next_attempt = now + self._backoff
+        if self._debug:
+            print(f"[VolumeService] Falha em obter interface (tentativa {self._attempts}, nova em {self._backoff:.1f}s)", file=sys.stderr)
+        self._backoff = min(self._backoff * 2, self.BACKOFF_MAX)
+        return False
+
+    def _apply(self, level: float) -> bool:
+        if not self._try_acquire():
+            return False
+        try:
+            self._backend.set_level(level)
+            return True
+        except Exception:
+            # Interface inválida (ex: sessão recriada): descarta e redescobre depois.
+            self._backend.release()
+            self._acquired = False
+            self._next_attempt = time.monotonic() + self._backoff
+            return False
+
+    def _run(self):
+        self._backend.thread_init()
+        try:
+            self._loop()
+        finally:
+            self._backend.thread_exit()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                level = self._pending
+                self._pending = None
+                self._busy = True
+            ok = self._apply(level)
+            with self._cond:
+                self._busy = False
+                if not ok and self._pending is None:
+                    # Mantém o alvo para reaplicar quando a interface aparecer.
+                    self._pending = level
+                    delay = max(0.0, self._next_attempt - time.monotonic())
+                    self._cond.wait(timeout=delay)
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Aguarda o worker aplicar o alvo pendente; False se expirar ou sem interface."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending is not None or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout=1.0)
 
     def is_available(self) -> bool:
-        return self._iface is not None
+        return self._backend.real and self._acquired
 
     def get_percent(self) -> int:
         return self._current_percent
 
     def set_percent(self, percent: int):
-        
-        if self._iface is None:
-            self._acquire_interface()
         percent = max(0, min(100, percent))
         self._current_percent = percent
         if percent > 0:
             self._last_non_zero = percent / 100.0
-        if self._iface:
-            try:
-                self._iface.SetMasterVolume(percent / 100.0, None)
-            except Exception:
-                pass
-        elif self._debug:
+        self._submit(percent / 100.0)
+        if self._debug and not self.is_available():
             print(f"[VolumeService] set_percent lógico (sem interface) -> {percent}%", file=sys.stderr)
 
     def increase(self, step: int = 10):
@@ -91,32 +241,20 @@ class VolumeService:
         return self._current_percent
 
     def mute(self):
-        if self._iface is None:
-            self._acquire_interface()
         if self._current_percent > 0:
             self._last_non_zero = self._current_percent / 100.0
-        if self._iface:
-            try:
-                self._iface.SetMasterVolume(0.0, None)
-            except Exception:
-                pass
         self._current_percent = 0
-        if self._debug and self._iface is None:
+        self._submit(0.0)
+        if self._debug and not self.is_available():
             print("[VolumeService] mute lógico (sem interface)", file=sys.stderr)
 
     def unmute(self, default_percent: int = 50):
-        if self._iface is None:
-            self._acquire_interface()
         target = self._last_non_zero if self._last_non_zero > 0.01 else default_percent / 100.0
         percent = int(target * 100)
         self._current_percent = percent
-        if self._iface:
-            try:
-                self._iface.SetMasterVolume(target, None)
-            except Exception:
-                pass
+        self._submit(target)
         if percent > 0:
             self._last_non_zero = target
-        if self._debug and self._iface is None:
+        if self._debug and not self.is_available():
             print(f"[VolumeService] unmute lógico -> {percent}% (sem interface)", file=sys.stderr)
         return percent
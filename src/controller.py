@@ -1,21 +1,37 @@
+import signal
 import sys
-from app.messaging import RabbitMQClient
-from app.config import load_config
+from app.messaging import FlowControl, RabbitMQClient
+from app.config import ConfigLoader
 from app.logging_setup import init_logger
+from app.health import mark_ready
 import logging
 
 def enviar_comandos():
     init_logger()
     logger = logging.getLogger("controller")
-    config = load_config()
-    mq = RabbitMQClient()
+    loader = ConfigLoader(sys.argv[1:])
+    config = loader.load()
+    mq = RabbitMQClient(config.broker_host)
     try:
         mq.connect()
         mq.declare_queue(config.queue_commands)
         mq.declare_queue(config.queue_events)
     except Exception:
         logger.error("Não foi possível conectar ao RabbitMQ. Verifique se o serviço está ativo.")
-        return
+        sys.exit(1)
+    mark_ready()
+    flow = FlowControl(high=config.commands_high_watermark)
+    recarga = {'pendente': False}
+
+    def aplicar_config():
+        nonlocal config
+        config, _ = loader.reload(config)
+        flow.high = config.commands_high_watermark
+        flow.low = flow.high // 2
+
+    if hasattr(signal, 'SIGHUP'):
+        # Sem handler, SIGHUP encerraria o controller; a recarga ocorre antes do próximo comando.
+        signal.signal(signal.SIGHUP, lambda signum, frame: recarga.update(pendente=True))
 
     print("\n🎮 Controlador Iniciado!")
     print("="*40)
@@ -23,12 +39,16 @@ def enviar_comandos():
     print("🔴 BOTÕES:     A, B, START, SELECT")
     print("⚙️  VELOCIDADE: TURBO, NORMAL, LENTO")
     print("🔊 ÁUDIO:      VOL+, VOL-, MUTE, UNMUTE")
+    print("🔄 CONFIG:     RELOAD")
     print("="*40)
     print("Digite 'SAIR' para encerrar.\n")
 
     while True:
         try:
             comando = input("Comando >> ").strip().upper()
+            if recarga['pendente']:
+                recarga['pendente'] = False
+                aplicar_config()
 
             if comando == 'SAIR':
                 break
@@ -39,7 +59,18 @@ def enviar_comandos():
                 'MUTE', 'UNMUTE', 'VOL+', 'VOL-'
             ]
 
-            if comando in comandos_validos:
+            if comando == 'RELOAD':
+                # Recarrega aqui e repassa ao game_loop (fila de comandos) e ao analytics (fila de eventos).
+                # Com várias réplicas de analytics só uma recebe; SIGHUP no run_all alcança todas.
+                aplicar_config()
+                mq.publish(config.queue_commands, comando)
+                mq.publish(config.queue_events, f'COMANDO_{comando}')
+                print(" 🔄 Recarga de configuração solicitada")
+            elif comando in comandos_validos:
+                # Sinal de fluxo: com o game_loop atrasado, novos comandos só aumentariam a fila.
+                if not flow.allow(mq.queue_depth(config.queue_commands)):
+                    print(" ⏳ Game loop ocupado, comando ignorado. Aguarde e tente novamente.")
+                    continue
                 # Enviar para o game_loop executar
                 mq.publish(config.queue_commands, comando)
                 # Enviar para o analytics contabilizar
@@ -1,9 +1,13 @@
+import signal
+import sys
 import time
 from pyboy import PyBoy
 from pyboy.utils import WindowEvent
 from app.constants import MEM_X_POS, MEM_Y_POS, MEM_BATTLE
-from app.config import load_config
+from app.config import ConfigLoader
 from app.volume import VolumeService
+from app.capture import capture_from_config
+from app.health import mark_ready
 from app.messaging import RabbitMQClient
 from app.logging_setup import init_logger
 import logging
@@ -15,16 +19,18 @@ except ImportError:
 
 
 VOLUME_INICIAL = 0
-CONFIG = load_config()
+CONFIG_LOADER = ConfigLoader(sys.argv[1:])
+CONFIG = CONFIG_LOADER.load()
 modo_lento_ativo = False
+recarga_pendente = False
 volume_atual = VOLUME_INICIAL
 volume_service = VolumeService(initial_percent=50)
 
 def main():
-    global modo_lento_ativo, volume_atual
+    global modo_lento_ativo, volume_atual, recarga_pendente
     print(f"Iniciando PyBoy com ROM: {CONFIG.rom_path}")
     pyboy = PyBoy(CONFIG.rom_path, window_type="SDL2", sound=True)
-    pyboy.set_emulation_speed(1) 
+    pyboy.set_emulation_speed(CONFIG.emulation_speed)
 
     if volume_service.is_available():
         print(f"🔊 Volume inicial do processo: {volume_service.get_percent()}%")
@@ -34,17 +40,48 @@ def main():
 
     init_logger()
     logger = logging.getLogger("game_loop")
-    mq = RabbitMQClient()
+    mq = RabbitMQClient(CONFIG.broker_host)
     try:
         mq.connect()
         mq.declare_queue(CONFIG.queue_commands)
         mq.declare_queue(CONFIG.queue_events)
+        mq.declare_queue(CONFIG.queue_steps, max_length=CONFIG.steps_max_length)
     except Exception:
         logger.error("Falha ao iniciar conexões RabbitMQ")
-        return
+        pyboy.stop(save=False)
+        # Código != 0 para o supervisor aplicar a política de restart.
+        sys.exit(1)
 
     logger.info("Loop iniciado. Aguardando comandos e emitindo eventos...")
 
+    def recarregar_config():
+        # Aplica ajustes sem reiniciar o emulador (estado do jogo preservado).
+        global CONFIG
+        CONFIG, alterados = CONFIG_LOADER.reload(CONFIG)
+        if 'command_max_age' in alterados:
+            mq.set_max_age(CONFIG.queue_commands, CONFIG.command_max_age)
+        if 'emulation_speed' in alterados and not modo_lento_ativo:
+            pyboy.set_emulation_speed(CONFIG.emulation_speed)
+        if 'capture_fps' in alterados and capture:
+            capture.set_fps(CONFIG.capture_fps)
+
+    def on_sighup(signum, frame):
+        global recarga_pendente
+        recarga_pendente = True
+
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, on_sighup)
+
+    capture = capture_from_config(pyboy, CONFIG)
+
+    def tick(frames: int = 1) -> bool:
+        # Todo tick passa por aqui para a captura ver também os frames dos comandos.
+        ok = True
+        for _ in range(frames):
+            ok = pyboy.tick()
+            if capture:
+                capture.on_tick()
+        return ok
 
     def on_command(comando: str):
         global modo_lento_ativo, volume_atual
@@ -56,9 +93,11 @@ def main():
             pyboy.set_emulation_speed(0)
         elif comando == 'NORMAL':
             modo_lento_ativo = False
-            pyboy.set_emulation_speed(1)
+            pyboy.set_emulation_speed(CONFIG.emulation_speed)
         elif comando == 'LENTO':
             modo_lento_ativo = True
+        elif comando == 'RELOAD':
+            recarregar_config()
         elif comando == 'MUTE':
             volume_service.mute()
             volume_atual = 0
@@ -100,24 +139,35 @@ def main():
             if comando in mapa_comandos:
                 press, release = mapa_comandos[comando]
                 pyboy.send_input(press)
-                for _ in range(15): pyboy.tick()
+                tick(15)
                 pyboy.send_input(release)
-                for _ in range(10): pyboy.tick()
+                tick(10)
 
-    mq.consume(CONFIG.queue_commands, on_command)
+    # Comandos atrasados (game loop travado) são descartados em vez de repetidos em rajada.
+    mq.consume(CONFIG.queue_commands, on_command, max_age=CONFIG.command_max_age)
 
     last_x = pyboy.memory[MEM_X_POS]
     last_y = pyboy.memory[MEM_Y_POS]
     in_battle = False
+    ready = False
+    frame = 0
 
     try:
-        while pyboy.tick():
-            mq.process_data_events(time_limit=0)
+        while tick():
+            if not ready:
+                mark_ready()
+                ready = True
+            frame += 1
+            if frame % CONFIG.poll_every == 0:
+                mq.process_data_events(time_limit=0)
+            if recarga_pendente:
+                recarga_pendente = False
+                recarregar_config()
             curr_x = pyboy.memory[MEM_X_POS]
             curr_y = pyboy.memory[MEM_Y_POS]
             
             if curr_x != last_x or curr_y != last_y:
-                mq.publish(CONFIG.queue_events, 'EVENTO_PASSO')
+                mq.publish(CONFIG.queue_steps, 'EVENTO_PASSO')
                 last_x = curr_x
                 last_y = curr_y
             battle_val = pyboy.memory[MEM_BATTLE]
@@ -132,6 +182,10 @@ def main():
     except KeyboardInterrupt:
         logger.info("Encerrando emulador...")
     finally:
+        if mq.stale_dropped:
+            logger.info("Comandos descartados por atraso: %d", mq.stale_dropped)
+        if capture:
+            capture.close()
         pyboy.stop()
         mq.close()
 
@@ -5,7 +5,8 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SRC = os.path.join(ROOT, 'src')
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
-ENV_KEYS = ["PYBOY_ROM", "QUEUE_COMMANDS", "QUEUE_EVENTS"]
+from app.config import ENV_VARS
+ENV_KEYS = ENV_VARS
 @pytest.fixture(autouse=True)
 def clean_env():
     backup = {k: os.environ.get(k) for k in ENV_KEYS}
@@ -17,3 +18,14 @@ def clean_env():
             os.environ.pop(k, None)
         else:
             os.environ[k] = v
+
+class FakeClock:
+    """Relógio manual: os testes avançam `t` em vez de dormir."""
+    def __init__(self):
+        self.t = 0.0
+    def __call__(self):
+        return self.t
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import uuid
+import pytest
+np = pytest.importorskip("numpy")
+from app.capture import FrameCapture, FrameRing, SegmentWriter
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+class ListSink:
+    def __init__(self):
+        self.frames = []
+    def write(self, frame):
+        self.frames.append(frame)
+    def close(self):
+        pass
+
+def _screen():
+    screen = np.zeros((144, 160, 4), dtype=np.uint8)
+    screen[..., 0] = np.arange(160, dtype=np.uint8)
+    return screen
+
+def test_capture_rate_and_downsample(clock):
+    screen = _screen()
+    sink = ListSink()
+    cap = FrameCapture(screen, [sink], fps=10, scale=2, max_inflight=16, clock=clock)
+    for _ in range(60):
+        clock.t += 1 / 60
+        cap.on_tick()
+    cap.close()
+    assert len(sink.frames) == 10
+    assert sink.frames[0].shape == (72, 80, 3)
+    assert sink.frames[0][0, 1, 0] == 2
+
+def test_capture_rate_is_wall_clock_limited_in_turbo(clock):
+    sink = ListSink()
+    cap = FrameCapture(_screen(), [sink], fps=10, max_inflight=16, clock=clock)
+    # 10x a velocidade normal: 600 frames de jogo em 1 s de relógio.
+    for _ in range(600):
+        clock.t += 1 / 600
+        cap.on_tick()
+    cap.close()
+    # ~10 por segundo de relógio (100 sem o limite), com a folga de jitter.
+    assert 10 <= len(sink.frames) <= 11
+    assert cap.dropped == 0
+
+def test_set_fps_changes_rate(clock):
+    sink = ListSink()
+    cap = FrameCapture(_screen(), [sink], fps=10, max_inflight=64, clock=clock)
+    cap.set_fps(30)
+    for _ in range(60):
+        clock.t += 1 / 60
+        cap.on_tick()
+    cap.close()
+    assert len(sink.frames) == 30
+
+def test_capture_snapshots_buffer():
+    screen = _screen()
+    sink = ListSink()
+    cap = FrameCapture(screen, [sink], fps=60, scale=1)
+    cap.on_tick()
+    screen[...] = 255
+    cap.close()
+    assert sink.frames[0][0, 0, 1] == 0
+
+def test_frame_ring_roundtrip():
+    name = f"pyboy_test_{uuid.uuid4().hex[:8]}"
+    ring = FrameRing.create(name, (4, 5, 3), slots=2)
+    reader = FrameRing.attach(name)
+    try:
+        assert reader.latest() is None
+        for v in (1, 2, 3):
+            ring.write(np.full((4, 5, 3), v, dtype=np.uint8))
+        assert reader.count == 3
+        assert reader.shape == (4, 5, 3)
+        assert int(reader.latest()[0, 0, 0]) == 3
+    finally:
+        reader.close()
+        ring.close()
+
+def test_frame_ring_survives_external_readers():
+    name = f"pyboy_test_{uuid.uuid4().hex[:8]}"
+    ring = FrameRing.create(name, (4, 5, 3), slots=2)
+    ring.write(np.full((4, 5, 3), 7, dtype=np.uint8))
+    leitor = (f"import sys; sys.path.insert(0, {SRC!r}); from app.capture import FrameRing; "
+              f"r = FrameRing.attach({name!r}); print(int(r.latest()[0, 0, 0])); r.close()")
+    try:
+        # Cada leitor é um processo separado que sai antes do próximo anexar.
+        for _ in range(2):
+            out = subprocess.run([sys.executable, "-c", leitor], capture_output=True, text=True, timeout=30)
+            assert out.returncode == 0, out.stderr
+            assert out.stdout.strip() == "7"
+    finally:
+        ring.close()
+
+def test_segment_writer_rolls(tmp_path):
+    w = SegmentWriter(str(tmp_path), frames_per_segment=2, keep=2)
+    for v in range(7):
+        w.write(np.full((2, 2, 3), v, dtype=np.uint8))
+    w.close()
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["segmento_000002.npz", "segmento_000003.npz"]
+    assert np.load(tmp_path / files[-1])["frames"].shape == (1, 2, 2, 3)
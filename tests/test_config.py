@@ -1,6 +1,6 @@
 import os
 import pytest
-from app.config import load_config
+from app.config import ConfigError, ConfigLoader, load_config
 
 def test_defaults():
     cfg = load_config()
@@ -23,3 +23,76 @@ def test_overrides(rom, cmd_q, evt_q):
     assert cfg.rom_path == rom
     assert cfg.queue_commands == cmd_q
     assert cfg.queue_events == evt_q
+
+def test_file_env_cli_precedence(tmp_path):
+    cfg_file = tmp_path / "pyboy.toml"
+    cfg_file.write_text(
+        'rom_path = "file.gb"\n'
+        '[game_loop]\npoll_every = 4\ncommand_max_age = 1.5\n'
+        '[broker]\nprefetch = 10\n'
+    )
+    os.environ["PYBOY_POLL_EVERY"] = "8"
+    cfg = load_config(["--config", str(cfg_file), "--set", "broker.prefetch=20"])
+    assert cfg.rom_path == "file.gb"
+    assert cfg.command_max_age == 1.5
+    assert cfg.poll_every == 8
+    assert cfg.prefetch == 20
+    assert cfg.queue_events == "fila_eventos"
+
+def test_json_file_from_env(tmp_path):
+    cfg_file = tmp_path / "pyboy.json"
+    cfg_file.write_text('{"queues": {"commands": "cmds"}, "analytics": {"ack_batch": 5}}')
+    os.environ["PYBOY_CONFIG"] = str(cfg_file)
+    cfg = load_config()
+    assert cfg.queue_commands == "cmds"
+    assert cfg.ack_batch == 5
+
+@pytest.mark.parametrize("argv", [
+    ["--set", "broker.prefetch=abc"],
+    ["--set", "broker.prefetch=0"],
+    ["--set", "nao.existe=1"],
+    ["--set", "broker.prefetch"],
+])
+def test_invalid_values(argv):
+    with pytest.raises(ConfigError):
+        load_config(argv)
+
+def test_reload_applies_only_reloadable(tmp_path):
+    cfg_file = tmp_path / "pyboy.toml"
+    cfg_file.write_text('[game_loop]\nemulation_speed = 1\n')
+    loader = ConfigLoader(["--config", str(cfg_file)])
+    cfg = loader.load()
+    cfg_file.write_text('rom_path = "outra.gb"\n[broker]\nprefetch = 200\n[game_loop]\nemulation_speed = 3\n')
+    new, changed = loader.reload(cfg)
+    assert changed == ["emulation_speed"]
+    assert new.emulation_speed == 3
+    assert new.rom_path == cfg.rom_path
+    assert new.prefetch == cfg.prefetch
+
+def test_reload_error_keeps_current(tmp_path):
+    cfg_file = tmp_path / "pyboy.toml"
+    cfg_file.write_text('[broker]\nprefetch = 7\n')
+    loader = ConfigLoader(["--config", str(cfg_file)])
+    cfg = loader.load()
+    cfg_file.write_text('[broker]\nprefetch = "x"\n')
+    new, changed = loader.reload(cfg)
+    assert new is cfg and changed == []
+
+@pytest.mark.parametrize("raw,expected", [("1", True), ("true", True), ("0", False), ("off", False)])
+def test_bool_fields(raw, expected):
+    os.environ["PYBOY_CAPTURE"] = raw
+    assert load_config().capture is expected
+
+def test_bool_field_rejects_garbage():
+    with pytest.raises(ConfigError):
+        load_config(["--set", "capture.enabled=talvez"])
+
+def test_runtime_knobs_reload(tmp_path):
+    cfg_file = tmp_path / "pyboy.toml"
+    cfg_file.write_text('[dashboard]\nhz = 2\nport = 8765\n[capture]\nfps = 10\n')
+    loader = ConfigLoader(["--config", str(cfg_file)])
+    cfg = loader.load()
+    cfg_file.write_text('[dashboard]\nhz = 5\nport = 9000\n[capture]\nfps = 30\n[supervisor]\nanalytics_replicas = 2\n')
+    new, changed = loader.reload(cfg)
+    assert sorted(changed) == ["capture_fps", "dashboard_hz"]
+    assert new.dashboard_port == 8765 and new.analytics_replicas == 1
@@ -0,0 +1,55 @@
+import json
+import urllib.request
+import pytest
+from app.dashboard import DashboardServer, LiveMetrics
+from app.report import SessionStats
+
+def test_diff_only_reports_changes(clock):
+    s = SessionStats(clock=clock)
+    m = LiveMetrics(s)
+    first = m.diff()
+    assert first['passos'] == 0
+    assert m.diff() == {}
+    s.record_step()
+    assert m.diff() == {'passos': 1}
+
+def test_derived_metrics(clock):
+    s = SessionStats(clock=clock)
+    m = LiveMetrics(s)
+    for _ in range(10):
+        s.record_step()
+    s.record_battle()
+    for cmd in ['UP', 'UP', 'A', 'UP', 'B', 'A']:
+        s.record_command(cmd)
+    clock.t = 120.0
+    snap = m.snapshot()
+    assert snap['passos_por_minuto'] == pytest.approx(5.0)
+    assert snap['taxa_batalha'] == pytest.approx(10.0)
+    assert snap['apm'] == pytest.approx(3.0)
+    assert snap['top_comandos'][:2] == [['UP', 3], ['A', 2]]
+
+def test_top_follows_new_commands(clock):
+    s = SessionStats(clock=clock)
+    m = LiveMetrics(s)
+    s.record_command('UP')
+    assert m.snapshot()['top_comandos'] == [['UP', 1]]
+    s.record_command('A')
+    s.record_command('A')
+    assert m.diff()['top_comandos'] == [['A', 2], ['UP', 1]]
+
+def test_sse_stream_sends_snapshot_then_diffs():
+    s = SessionStats()
+    server = DashboardServer(LiveMetrics(s), port=0, tick_hz=50)
+    server.start()
+    try:
+        resp = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/events", timeout=5)
+        first = json.loads(resp.readline().decode()[len("data: "):])
+        resp.readline()
+        assert first['passos'] == 0
+        s.record_battle()
+        update = json.loads(resp.readline().decode()[len("data: "):])
+        assert update['batalhas'] == 1
+        assert 'passos' not in update
+        resp.close()
+    finally:
+        server.stop()
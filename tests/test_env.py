@@ -0,0 +1,84 @@
+import os
+import pytest
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyboy")
+from app.env import ACTIONS, OBS_SIZE, PyBoyEnv, VecEnv
+
+ROM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "roms", "pokemon_red.gb")
+
+@pytest.fixture
+def env():
+    e = PyBoyEnv(ROM, frames=4, boot_frames=60, max_steps=3)
+    yield e
+    e.close()
+
+def test_reset_is_deterministic(env):
+    first = env.reset()
+    assert first.shape == (OBS_SIZE,) and first.dtype == np.uint8
+    trace = [env.step(a)[0] for a in ('START', 'A', 'DOWN')]
+    env.reset()
+    again = [env.step(a)[0] for a in ('START', 'A', 'DOWN')]
+    assert all((a == b).all() for a, b in zip(trace, again))
+
+def test_step_contract(env):
+    env.reset()
+    obs, reward, done, info = env.step(ACTIONS.index('UP'), frames=2)
+    assert reward == 0.0 and not done
+    assert set(info) == {'passo', 'batalha'}
+    env.step('NOOP', frames=1)
+    assert env.step('B')[2]
+
+@pytest.mark.parametrize("action", ['JUMP', -1, len(ACTIONS)])
+def test_unknown_action(env, action):
+    with pytest.raises(ValueError):
+        env.step(action)
+
+def test_numpy_actions(env):
+    env.reset()
+    env.step(np.int64(ACTIONS.index('A')))
+    env.step(np.array([1], dtype=np.int32)[0])
+
+def test_vec_env_shared_observations():
+    vec = VecEnv(2, rom_path=ROM, frames=2, max_steps=2)
+    try:
+        obs = vec.reset()
+        assert obs.shape == (2, OBS_SIZE)
+        obs, rewards, dones, infos = vec.step(['NOOP', 'A'])
+        assert rewards.shape == (2,) and not dones.any()
+        _, _, dones, _ = vec.step(['NOOP', 'NOOP'])
+        assert dones.all()
+    finally:
+        vec.close()
+
+def test_vec_env_numpy_actions():
+    vec = VecEnv(2, rom_path=ROM, frames=2, max_steps=5)
+    try:
+        vec.reset()
+        obs, rewards, dones, _ = vec.step(np.array([0, ACTIONS.index('A')]))
+        assert obs.shape == (2, OBS_SIZE) and not dones.any()
+        with pytest.raises(ValueError):
+            vec.step(np.array([0, -1]))
+        # Os workers continuam vivos após a ação rejeitada.
+        vec.step(np.array([1, 2]))
+    finally:
+        vec.close()
+
+def test_button_needs_two_frames(env):
+    env.reset()
+    env.step('NOOP', frames=1)
+    with pytest.raises(ValueError):
+        env.step('START', frames=1)
+
+def _wram_after(action, steps=200):
+    e = PyBoyEnv(ROM, frames=2, boot_frames=60)
+    try:
+        e.reset()
+        for _ in range(steps):
+            e.step(action)
+        return bytes(e._pyboy.memory[0xC000:0xE000])
+    finally:
+        e.close()
+
+def test_two_frame_button_reaches_game():
+    noop = _wram_after('NOOP')
+    assert _wram_after('START') != noop
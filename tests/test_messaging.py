@@ -0,0 +1,154 @@
+import time
+from types import SimpleNamespace
+
+import pika.exceptions
+import pika.frame
+import pytest
+
+from app.local_broker import LocalBroker, LocalClient
+from app.messaging import SENT_AT_HEADER, FlowControl, RabbitMQClient, queue_arguments
+
+
+class FakeChannel:
+    """Canal que serializa as propriedades como o pika faz ao enviar ao broker."""
+
+    def __init__(self):
+        self.queues = {}
+        self.consumers = {}
+        self.acked = []
+        self.prefetch = None
+        self.declared = {}
+
+    def queue_declare(self, queue, arguments=None, passive=False):
+        existing = self.declared.get(queue)
+        if passive:
+            return existing
+        if existing is not None and existing != (arguments or {}):
+            raise pika.exceptions.ChannelClosedByBroker(406, "PRECONDITION_FAILED - inequivalent arg 'x-max-length'")
+        self.declared[queue] = arguments or {}
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        data = pika.frame.Header(1, len(body), properties).marshal()
+        _, frame = pika.frame.decode_frame(data)
+        self.queues.setdefault(routing_key, []).append((body.encode(), frame.properties))
+
+    def basic_qos(self, prefetch_count):
+        self.prefetch = prefetch_count
+
+    def basic_consume(self, queue, on_message_callback):
+        self.consumers[queue] = on_message_callback
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def deliver(self, queue):
+        for tag, (body, props) in enumerate(self.queues.pop(queue, []), 1):
+            self.consumers[queue](self, SimpleNamespace(delivery_tag=tag), props, body)
+
+
+def fake_client():
+    mq = RabbitMQClient()
+    mq._channel = FakeChannel()
+    return mq
+
+
+def test_queue_arguments():
+    assert queue_arguments() == {}
+    assert queue_arguments(100) == {"x-max-length": 100, "x-overflow": "drop-head"}
+    assert queue_arguments(5, "reject-publish", 2000) == {
+        "x-max-length": 5, "x-overflow": "reject-publish", "x-message-ttl": 2000}
+
+def test_flow_control_hysteresis():
+    flow = FlowControl(high=10)
+    assert flow.allow(9)
+    assert not flow.allow(10)
+    assert not flow.allow(6)
+    assert flow.allow(5)
+
+def test_drop_head_keeps_newest():
+    broker = LocalBroker()
+    mq = LocalClient(broker)
+    mq.declare_queue("passos", max_length=3)
+    for i in range(5):
+        mq.publish("passos", str(i))
+    assert mq.queue_depth("passos") == 3
+    assert broker.dropped("passos") == 2
+    got = []
+    mq.consume("passos", got.append)
+    mq.process_data_events()
+    assert got == ["2", "3", "4"]
+
+def test_reject_publish_keeps_oldest():
+    broker = LocalBroker()
+    mq = LocalClient(broker)
+    mq.declare_queue("q", max_length=2, overflow="reject-publish")
+    for i in range(4):
+        mq.publish("q", str(i))
+    got = []
+    mq.consume("q", got.append)
+    mq.process_data_events()
+    assert got == ["0", "1"]
+
+def test_stale_commands_are_dropped():
+    broker = LocalBroker()
+    mq = LocalClient(broker)
+    mq.declare_queue("cmd")
+    mq.publish("cmd", "UP")
+    time.sleep(0.05)
+    mq.publish("cmd", "DOWN")
+    got = []
+    mq.consume("cmd", got.append, max_age=0.03)
+    mq.process_data_events()
+    assert got == ["DOWN"]
+    assert mq.stale_dropped == 1
+
+def test_publish_headers_encode_with_pika():
+    mq = fake_client()
+    mq.publish("cmd", "UP")
+    _, props = mq.channel.queues["cmd"][0]
+    assert isinstance(props.headers[SENT_AT_HEADER], int)
+
+def test_consume_wrapper_drops_stale_and_acks_all():
+    mq = fake_client()
+    ch = mq.channel
+    mq.publish("cmd", "UP")
+    _, props = ch.queues["cmd"][0]
+    props.headers[SENT_AT_HEADER] -= 5000
+    mq.publish("cmd", "DOWN")
+    got = []
+    mq.consume("cmd", got.append, max_age=2.0)
+    ch.deliver("cmd")
+    assert got == ["DOWN"]
+    assert mq.stale_dropped == 1
+    assert ch.acked == [1, 2]
+
+def test_declare_with_changed_arguments_falls_back_to_existing_queue():
+    mq = fake_client()
+    antigo = mq.channel
+    antigo.declared["passos"] = {"x-max-length": 1000, "x-overflow": "drop-head"}
+    novo = FakeChannel()
+    novo.declared = antigo.declared
+    mq._connection = SimpleNamespace(channel=lambda: novo, is_open=True)
+    mq.declare_queue("passos", max_length=50)
+    assert mq.channel is novo
+    assert novo.declared["passos"]["x-max-length"] == 1000
+
+def _local_client():
+    mq = LocalClient(LocalBroker())
+    mq.declare_queue("cmd")
+    return mq, mq.process_data_events
+
+def _rabbit_client():
+    mq = fake_client()
+    return mq, lambda: mq.channel.deliver("cmd")
+
+@pytest.mark.parametrize("make", [_local_client, _rabbit_client])
+def test_set_max_age_applies_to_existing_consumer(make):
+    mq, deliver = make()
+    got = []
+    mq.consume("cmd", got.append)
+    mq.set_max_age("cmd", 0.01)
+    mq.publish("cmd", "UP")
+    time.sleep(0.03)
+    deliver()
+    assert got == [] and mq.stale_dropped == 1
@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+import stat
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.report import Checkpointer, SessionStats, export, parse_formats, render_text, write_atomic
+
+INICIO = datetime(2024, 1, 1, 10, 0, 0)
+
+@pytest.fixture
+def sessao(clock):
+    s = SessionStats(inicio=INICIO, clock=clock)
+    for _ in range(30):
+        s.record_step()
+    s.record_battle()
+    clock.t = 90.0
+    for cmd in ['UP', 'UP', 'A', 'TURBO', 'VOL+', 'UP']:
+        s.record_command(cmd)
+    for _ in range(10):
+        s.record_step()
+    return s
+
+def test_resumo_aggregates(sessao):
+    r = sessao.resumo(INICIO + timedelta(minutes=2))
+    assert r['passos'] == 40 and r['batalhas'] == 1
+    assert r['passos_por_minuto'] == pytest.approx(20.0)
+    assert r['taxa_batalha'] == pytest.approx(2.5)
+    assert r['comandos_por_categoria'] == {'movimento': 3, 'botao': 1, 'velocidade': 1, 'audio': 1}
+    assert r['top_comandos'][0] == ('UP', 3)
+
+def test_serie_por_minuto(sessao):
+    assert sessao.serie() == [
+        {'minuto': 0, 'passos': 30, 'batalhas': 1, 'comandos': 0},
+        {'minuto': 1, 'passos': 10, 'batalhas': 0, 'comandos': 6},
+    ]
+
+def test_render_text_sections(sessao):
+    texto = render_text(sessao.resumo(INICIO + timedelta(minutes=2)))
+    assert "Duração:  0h 2m 0s" in texto
+    assert "Taxa de Encontros:     2.50%" in texto
+    assert "1. UP       →    3 vezes" in texto
+    assert "APM (Actions/min):     3" in texto
+
+def test_render_text_empty_session():
+    texto = render_text(SessionStats(inicio=INICIO).resumo(INICIO))
+    assert "COMANDOS EXECUTADOS" not in texto
+    assert "Total de Passos:       0" in texto
+
+def test_export_formats(tmp_path, sessao):
+    base = str(tmp_path / "relatorio")
+    paths = export(sessao, base, ['txt', 'json', 'csv'], fim=INICIO + timedelta(minutes=2))
+    assert paths == [base + ".txt", base + ".json", base + "_serie.csv"]
+    dados = json.loads((tmp_path / "relatorio.json").read_text(encoding='utf-8'))
+    assert dados['passos'] == 40
+    assert dados['inicio'] == INICIO.isoformat()
+    assert len(dados['serie_por_minuto']) == 2
+    assert dados['comandos_detalhados'] == {'UP': 3, 'A': 1, 'TURBO': 1, 'VOL+': 1}
+    with open(base + "_serie.csv", encoding='utf-8') as f:
+        linhas = list(csv.DictReader(f))
+    assert linhas[1]['comandos'] == '6'
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.skipif(os.name == 'nt', reason="permissões POSIX")
+def test_report_files_follow_umask(tmp_path):
+    path = tmp_path / "r.txt"
+    write_atomic(str(path), "x")
+    mask = os.umask(0)
+    os.umask(mask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~mask
+
+def test_write_atomic_concurrent_writers(tmp_path):
+    path = str(tmp_path / "ck.json")
+    conteudos = [str(i) * 1000 for i in range(8)]
+
+    erros = []
+
+    def escrever(c):
+        try:
+            for _ in range(50):
+                write_atomic(path, c)
+        except OSError as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=escrever, args=(c,)) for c in conteudos]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert erros == []
+    assert (tmp_path / "ck.json").read_text(encoding='utf-8') in conteudos
+    assert [p.name for p in tmp_path.iterdir()] == ["ck.json"]
+
+def test_parse_formats():
+    assert parse_formats(" JSON, csv ") == ['json', 'csv']
+    with pytest.raises(ValueError):
+        parse_formats("txt,xml")
+
+def test_checkpoint_interval(tmp_path, clock):
+    s = SessionStats(clock=clock)
+    cp = Checkpointer(s, str(tmp_path / "ck"), 60, ['json'], clock=clock)
+    s.record_step()
+    assert not cp.maybe_write()
+    clock.t = 61
+    assert cp.maybe_write()
+    assert json.loads((tmp_path / "ck.json").read_text(encoding='utf-8'))['passos'] == 1
+    assert not cp.maybe_write()
+    cp.discard()
+    assert list(tmp_path.iterdir()) == []
+
+def test_report_is_fast_for_long_sessions(clock):
+    s = SessionStats(clock=clock)
+    for minuto in range(24 * 60):
+        clock.t = minuto * 60.0
+        s.record_step()
+        s.record_command('UP')
+    inicio = time.perf_counter()
+    render_text(s.resumo())
+    assert time.perf_counter() - inicio < 0.05
@@ -0,0 +1,110 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+from app.health import REPLICA_ENV, broker_reachable, mark_ready, READY_ENV
+from app.config import load_config
+from app.supervisor import ProcessSpec, Supervisor, parse_cpus
+
+READY = "from app.health import mark_ready; mark_ready()"
+
+def _spec(name, code, **kw):
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    script = f"import sys; sys.path.insert(0, {src!r}); {code}"
+    return ProcessSpec(name, [sys.executable, "-c", script], **kw)
+
+def _poll_until(sup, cond, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        sup.poll_once()
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+@pytest.mark.parametrize("value,expected", [(None, None), ("", None), ("2", {2}), ("0,2-4", {0, 2, 3, 4})])
+def test_parse_cpus(value, expected):
+    assert parse_cpus(value) == expected
+
+def test_invalid_restart_policy():
+    with pytest.raises(ValueError):
+        ProcessSpec("x", ["true"], restart="sometimes")
+
+def test_mark_ready_writes_file(tmp_path, monkeypatch):
+    path = tmp_path / "r.ready"
+    monkeypatch.setenv(READY_ENV, str(path))
+    mark_ready()
+    assert path.exists()
+
+def test_analytics_replicas_are_tagged(monkeypatch):
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import run_all
+    extra = ["--set", "supervisor.analytics_replicas=3", "--set", "dashboard.port=9000"]
+    specs = run_all._build_specs(load_config(extra), extra)
+    analytics = [s for s in specs if s.name.startswith("Analytics")]
+    assert [s.env.get(REPLICA_ENV) for s in analytics] == ["1", "2", "3"]
+    assert [load_config(s.argv[2:]).dashboard_port for s in analytics] == [9000, 0, 0]
+
+def test_broker_probe():
+    srv = socket.socket()
+    srv.bind(("127.0.0.1", 0))
+    srv.listen()
+    port = srv.getsockname()[1]
+    assert broker_reachable("127.0.0.1", port)
+    srv.close()
+    assert not broker_reachable("127.0.0.1", port, timeout=0.2)
+
+def test_start_waits_for_readiness():
+    sup = Supervisor([
+        _spec("a", READY + "; import time; time.sleep(30)"),
+        _spec("b", "import time; time.sleep(0.2); " + READY + "; time.sleep(30)"),
+    ])
+    try:
+        total = sup.start(ready_timeout=10)
+        assert total is not None and total >= 0.2
+        assert all(m.ready_at is not None for m in sup.processes)
+    finally:
+        sup.stop()
+
+def test_restart_on_failure_with_backoff():
+    sup = Supervisor([_spec("crash", "raise SystemExit(3)")], backoff_initial=0.05, backoff_max=0.2)
+    try:
+        sup.start(ready_timeout=0.1)
+        m = sup.processes[0]
+        assert _poll_until(sup, lambda: m.restarts >= 4)
+        assert m.backoff == pytest.approx(0.2)
+        assert not sup.stopping
+    finally:
+        sup.stop()
+
+def test_clean_exit_without_restart_stops_all():
+    sup = Supervisor([
+        _spec("done", "pass", restart="never"),
+        _spec("other", "import time; time.sleep(30)"),
+    ])
+    try:
+        sup.start(ready_timeout=0.1)
+        assert _poll_until(sup, lambda: sup.stopping)
+        assert sup.processes[0].finished
+    finally:
+        sup.stop()
+    assert sup.processes[1].proc.poll() is not None
+
+@pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="sched_setaffinity indisponível")
+def test_cpu_affinity_applied():
+    sup = Supervisor([_spec("pinned", "import time; time.sleep(30)", cpus={0})])
+    try:
+        sup.start(ready_timeout=0.1)
+        assert os.sched_getaffinity(sup.processes[0].proc.pid) == {0}
+    finally:
+        sup.stop()
+
+@pytest.mark.parametrize("script", ["analytics.py", "controller.py"])
+def test_broker_failure_exits_nonzero(script):
+    # Sem broker o processo deve sair com erro, para o supervisor reiniciá-lo com backoff.
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    proc = subprocess.run([sys.executable, os.path.join(src, script), "--set", "broker.host=invalid.invalid",
+                           "--set", "dashboard.port=0"], stdin=subprocess.DEVNULL, capture_output=True, timeout=60)
+    assert proc.returncode == 1
@@ -1,5 +1,7 @@
+import time
+import threading
 import pytest
-from app.volume import VolumeService
+from app.volume import NullBackend, VolumeService
 
 @pytest.mark.parametrize("start,expected", [(150,100), (-10,0), (50,50)])
 def test_initial_percent_clamped(start, expected):
@@ -49,3 +51,82 @@ def test_increase_after_mute_restores_last_non_zero():
     # unmute deve usar novo last_non_zero se >0
     r = v.unmute()
     assert r >= 20
+
+class _SlowBackend(NullBackend):
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.levels = []
+
+    def set_level(self, level):
+        time.sleep(self.delay)
+        self.levels.append(level)
+        super().set_level(level)
+
+class _FlakyBackend(NullBackend):
+    real = True
+
+    def __init__(self, fail_times):
+        super().__init__()
+        self.fail_times = fail_times
+        self.acquire_calls = 0
+
+    def acquire(self):
+        self.acquire_calls += 1
+        return self.acquire_calls > self.fail_times
+
+class _FastRetryVolume(VolumeService):
+    BACKOFF_INITIAL = 0.01
+
+def test_null_backend_applies_final_level():
+    backend = NullBackend()
+    v = VolumeService(initial_percent=30, backend=backend)
+    v.increase(); v.increase()
+    assert v.flush()
+    assert backend.level == pytest.approx(0.5)
+    assert not v.is_available()
+    v.close()
+
+def test_burst_is_coalesced():
+    backend = _SlowBackend()
+    v = VolumeService(initial_percent=0, backend=backend)
+    for _ in range(10):
+        v.increase()
+    assert v.flush(timeout=2.0)
+    assert backend.levels[-1] == pytest.approx(1.0)
+    assert backend.applied < 10
+    v.close()
+
+def test_rediscovery_uses_backoff():
+    backend = _FlakyBackend(fail_times=2)
+    v = _FastRetryVolume(initial_percent=40, backend=backend)
+    v.set_percent(60)
+    assert v.flush(timeout=2.0)
+    assert v.is_available()
+    assert backend.level == pytest.approx(0.6)
+    assert backend.acquire_calls == 3
+    v.close()
+
+class _ThreadBackend(NullBackend):
+    def __init__(self):
+        super().__init__()
+        self.threads = {}
+
+    def thread_init(self):
+        self.threads["init"] = threading.get_ident()
+
+    def acquire(self):
+        self.threads["acquire"] = threading.get_ident()
+        return True
+
+    def thread_exit(self):
+        self.threads["exit"] = threading.get_ident()
+
+def test_backend_thread_hooks_run_on_worker():
+    backend = _ThreadBackend()
+    v = VolumeService(initial_percent=30, backend=backend)
+    assert v.flush(timeout=2.0)
+    v.close()
+    assert set(backend.threads) == {"init", "acquire", "exit"}
+    assert len(set(backend.threads.values())) == 1
+    assert backend.threads["init"] != threading.get_ident()